@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO
+from pydantic import ValidationError
+from .cache import ResultCache, problem_key
+from .genetic.adaptive import adaptive_config
+from .genetic.runner import POPULATION_SIZE
+from .ingest import parse_problem
+from .models import BatchResult, CacheInfo, JobStatus, ProblemInput, SolverConfig
+from .solver import solve_assignment
+
+class BatchItem(NamedTuple):
+    index: int
+    source: Optional[str]  # file name or stdin line, for the CLI
+    problem: Optional[ProblemInput]
+    error: Optional[str] = None  # why the input could not be parsed
+
+def problem_cost(problem: ProblemInput) -> int:
+    """Rough work estimate used to order a batch: students x runs x generations (x population size)."""
+    solver = problem.solver
+    if solver.adaptive:
+        solver = adaptive_config(solver, problem.num_students, len(problem.groups))
+    runs = solver.islands if solver.islands > 1 else max(1, solver.runs)
+    return problem.num_students * runs * max(1, solver.generations) * (solver.population_size or POPULATION_SIZE)
+
+def read_files(paths: Iterable[str]) -> Iterator[BatchItem]:
+    """One problem per JSON file."""
+    for index, path in enumerate(paths):
+        try:
+            with open(path, 'rb') as f:
+                yield BatchItem(index, path, parse_problem(f.read()))
+        except (OSError, ValidationError) as e:
+            yield BatchItem(index, path, None, str(e))
+
+def read_jsonl(stream: TextIO, name: str = "<stdin>") -> Iterator[BatchItem]:
+    """One problem per non-empty line."""
+    index = 0
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        source = f"{name}:{number}"
+        try:
+            yield BatchItem(index, source, parse_problem(line))
+        except ValidationError as e:
+            yield BatchItem(index, source, None, str(e))
+        index += 1
+
+class BatchSolver:
+    """
+    Solves batches of problems on one shared process pool.
+
+    Each batch is submitted smallest first (by problem_cost), at most
+    `workers` problems ahead of the pool, so small problems finish early
+    instead of waiting behind large ones and several batches share the pool
+    fairly. Ordering needs the whole batch, so all items are read before the
+    first is submitted; results are yielded as they complete. With a
+    ResultCache, cached problems are answered without solving and new
+    results are stored. Checkpointed problems keep their files in
+    `checkpoint_dir`.
+    """
+
+    def __init__(self, workers: int = 0, cache: Optional[ResultCache] = None, checkpoint_dir: Optional[str] = None):
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.cache = cache
+        self.checkpoint_dir = checkpoint_dir
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self.executor
+
+    def solve(
+        self,
+        items: Iterable[BatchItem],
+        config: Optional[Callable[[ProblemInput], SolverConfig]] = None,
+        use_cache: bool = True,
+    ) -> Iterator[BatchResult]:
+        """
+        Yield a BatchResult per item in completion order. `config` maps a
+        problem to the solver settings to use (default: its own). Closing the
+        iterator early cancels the problems not yet started.
+        """
+        pending: List[BatchItem] = []
+        keys: Dict[int, str] = {}
+        for item in items:
+            if item.problem is None:
+                yield BatchResult(index=item.index, source=item.source, status=JobStatus.FAILED, error=item.error)
+                continue
+            if config is not None:
+                item = item._replace(problem=item.problem.model_copy(update={"solver": config(item.problem)}))
+            if self.cache is not None:
+                keys[item.index] = problem_key(item.problem)
+                cached = self.cache.get(keys[item.index]) if use_cache and not item.problem.solver.resume else None
+                if cached is not None:
+                    yield BatchResult(index=item.index, source=item.source, status=JobStatus.COMPLETED, result=cached)
+                    continue
+            pending.append(item)
+
+        pending.sort(key=lambda item: problem_cost(item.problem), reverse=True)
+        running: Dict[Future, tuple] = {}
+        pool = self._pool()
+        try:
+            while pending or running:
+                while pending and len(running) < self.workers:
+                    item = pending.pop()
+                    running[pool.submit(solve_assignment, item.problem, checkpoint_dir=self.checkpoint_dir)] = (item, time.monotonic())
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item, started = running.pop(future)
+                    seconds = time.monotonic() - started
+                    try:
+                        output = future.result()
+                    except Exception as e:
+                        yield BatchResult(
+                            index=item.index, source=item.source, status=JobStatus.FAILED, error=str(e), seconds=seconds,
+                        )
+                        continue
+                    key = keys.get(item.index)
+                    if key is not None:
+                        output.cache = CacheInfo(key=key, hit=False)
+                        self.cache.put(key, output)
+                    yield BatchResult(
+                        index=item.index, source=item.source, status=JobStatus.COMPLETED, result=output, seconds=seconds,
+                    )
+        finally:
+            for future in running:
+                future.cancel()
+
+    def shutdown(self):
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(cancel_futures=True)
+                self.executor = None
+
+def write_jsonl(results: Iterable[BatchResult], stream: TextIO) -> None:
+    """Write each result as one JSON line, flushing so consumers see it at once."""
+    for result in results:
+        stream.write(result.model_dump_json())
+        stream.write("\n")
+        stream.flush()
@@ -0,0 +1,214 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional
+from .models import SolverConfig
+from .solver import solve_assignment
+from .synthetic import CRITERION_KINDS, generate_problem
+from .genetic.compiled import CompiledProblem
+from .genetic.fitness import compute_penalties
+from .genetic.vectorized import np
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+RESULTS_VERSION = 1
+DEFAULT_SIZES = (20, 100, 500, 2000, 10000, 50000)
+
+class BenchmarkCase(NamedTuple):
+    name: str
+    students: int
+    groups: int
+    seed: int = 0
+    target_fitness: Optional[float] = None
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def run_case(case: BenchmarkCase, generator: Dict, solver: Dict) -> Dict:
+    """Generate and solve one case (a single run), timing it from progress events."""
+    problem = generate_problem(case.students, case.groups, seed=case.seed, **generator)
+    config = SolverConfig(**{"runs": 1, "workers": 1, "seed": case.seed, **solver, "progress_interval": 0.0, "profile": True})
+
+    first_feasible: Optional[float] = None
+    first_target: Optional[float] = None
+
+    def on_progress(event):
+        nonlocal first_feasible, first_target
+        if first_feasible is None and event.hard_violations == 0:
+            first_feasible = event.elapsed
+        if first_target is None and case.target_fitness is not None and event.best_fitness <= case.target_fitness:
+            first_target = event.elapsed
+
+    started = time.perf_counter()
+    output = solve_assignment(problem, config=config, on_progress=on_progress)
+    seconds = time.perf_counter() - started
+    run = output.stats.runs[0]
+    # Throughput of the fitness engine alone, without compilation, initialization or operators
+    evaluation_seconds = output.stats.profile.phases["evaluation"].seconds
+    compiled = CompiledProblem(problem)
+    assigned = output.assigned_groups()
+    hard, _ = compute_penalties([compiled.group_index[assigned[s_id]] for s_id in compiled.student_ids], compiled)
+
+    return {
+        "name": case.name,
+        "students": case.students,
+        "groups": problem.num_groups,
+        "seed": case.seed,
+        "generations": run.generations,
+        "stop_reason": run.stop_reason,
+        "seconds": seconds,
+        "evaluations": run.evaluations,
+        "evaluation_seconds": evaluation_seconds,
+        "evaluations_per_second": run.evaluations / evaluation_seconds if evaluation_seconds > 0 else None,
+        "best_fitness": run.fitness,
+        "hard_violations": hard,
+        "time_to_feasible": first_feasible,
+        "target_fitness": case.target_fitness,
+        "time_to_target": first_target,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+def run_suite(cases: List[BenchmarkCase], generator: Dict, solver: Dict, log=None) -> List[Dict]:
+    """Run every case in a fresh process so peak memory is measured per case."""
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for case in cases:
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as executor:
+            result = executor.submit(run_case, case, generator, solver).result()
+        if log is not None:
+            log(
+                f"{case.name}: {result['evaluations_per_second']:.0f} evals/s, "
+                f"best {result['best_fitness']:.0f} after {result['generations']} generations "
+                f"in {result['seconds']:.2f}s"
+            )
+        results.append(result)
+    return results
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _ratio(new: Optional[float], old: Optional[float]) -> str:
+    if new is None or old is None or old == 0:
+        return "-"
+    return f"{new / old:.2f}x"
+
+def compare(results: List[Dict], baseline: Dict) -> str:
+    """Text table of current results relative to a baseline results document."""
+    previous = {case["name"]: case for case in baseline["cases"]}
+    lines = [f"{'case':<12} {'evals/s':>10} {'feasible':>10} {'target':>10} {'memory':>10} {'best':>10}"]
+    for case in results:
+        old = previous.get(case["name"])
+        if old is None:
+            continue
+        lines.append(
+            f"{case['name']:<12} "
+            f"{_ratio(case['evaluations_per_second'], old['evaluations_per_second']):>10} "
+            f"{_ratio(case['time_to_feasible'], old['time_to_feasible']):>10} "
+            f"{_ratio(case['time_to_target'], old['time_to_target']):>10} "
+            f"{_ratio(case['peak_rss_mb'], old['peak_rss_mb']):>10} "
+            f"{_ratio(case['best_fitness'], old['best_fitness']):>10}"
+        )
+    return "\n".join(lines)
+
+def _solver_overrides(values: List[str]) -> Dict:
+    overrides = {}
+    for value in values:
+        key, _, raw = value.partition("=")
+        if key not in SolverConfig.model_fields:
+            raise SystemExit(f"Unknown solver setting {key!r}")
+        overrides[key] = raw
+    # Validate once so bad values fail before any case runs
+    SolverConfig(**overrides)
+    return overrides
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the GA solver on seeded synthetic problems.')
+    parser.add_argument('--sizes', default=",".join(map(str, DEFAULT_SIZES)), help='Comma-separated student counts')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for problem generation and the solver')
+    parser.add_argument('--students-per-group', type=int, default=25, help='Students per generated group (default 25)')
+    parser.add_argument('--criteria', default=",".join(CRITERION_KINDS), help='Criterion type per value column')
+    parser.add_argument('--exclusion-density', type=float, default=0.05, help='Exclusion pairs per student')
+    parser.add_argument('--ranking-density', type=float, default=0.5, help='Share of students with rankings')
+    parser.add_argument('--possible-ratio', type=float, default=0.5, help='Share of groups each student may join')
+    parser.add_argument('--generations', type=int, default=100, help='Generations per case (default 100)')
+    parser.add_argument('--time-limit', type=float, default=120.0, help='Seconds per case (default 120)')
+    parser.add_argument('--solver', action='append', default=[], metavar='KEY=VALUE', help='Extra solver setting, repeatable')
+    parser.add_argument('--compare', help='Results file of an earlier commit; its best fitness per case becomes the target')
+    parser.add_argument('--output', help='Write results JSON here (default stdout)')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    criteria = [kind for kind in args.criteria.split(",") if kind]
+    baseline = None
+    targets: Dict[str, float] = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        targets = {case["name"]: case["best_fitness"] for case in baseline["cases"]}
+
+    cases = [
+        BenchmarkCase(
+            f"n{size}", size, max(2, size // args.students_per_group),
+            seed=args.seed, target_fitness=targets.get(f"n{size}"),
+        )
+        for size in sizes
+    ]
+    generator = {
+        "criteria": criteria,
+        "exclusion_density": args.exclusion_density,
+        "ranking_density": args.ranking_density,
+        "possible_ratio": args.possible_ratio,
+    }
+    solver = {
+        "generations": args.generations,
+        "time_limit": args.time_limit,
+        **_solver_overrides(args.solver),
+    }
+
+    def log(message: str):
+        print(message, file=sys.stderr)
+
+    results = run_suite(cases, generator, solver, log=log)
+
+    document = {
+        "version": RESULTS_VERSION,
+        "commit": _git_commit(),
+        "created_at": time.time(),
+        "python": platform.python_version(),
+        "numpy": np.__version__ if np is not None else None,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "generator": generator,
+        "solver": solver,
+        "cases": results,
+    }
+    output = json.dumps(document, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if baseline is not None:
+        log(compare(results, baseline))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from .models import CacheInfo, ProblemInput, ProblemOutput, SolverConfig
+
+# Solver settings that change how a solve runs but not its result
+RESULT_NEUTRAL_SETTINGS = {
+    "workers", "engine", "transport", "fitness_cache_size", "progress_interval", "checkpoint", "checkpoint_interval",
+}
+
+def problem_key(data: ProblemInput, config: Optional[SolverConfig] = None) -> str:
+    """
+    Content hash of a problem and the solver settings that affect its result.
+
+    The problem is normalized first so inputs that only differ in the order of
+    students, groups, possible groups, exclusion pairs or previous assignments
+    share a key.
+    """
+    config = config or data.solver
+    problem = data.model_dump(mode="json", exclude={"solver", "students"})
+    # Built from the columns (as model_dump would) so both ingest forms share a key
+    students = data.student_columns()
+    problem["students"] = sorted(
+        (
+            {
+                "id": s_id,
+                "possible_groups": sorted(possible_groups),
+                "values": values,
+                "rankings": {str(g_id): rank for g_id, rank in rankings.items()} if rankings is not None else None,
+            }
+            for s_id, possible_groups, values, rankings in zip(*students)
+        ),
+        key=lambda student: student["id"],
+    )
+    problem["groups"] = sorted(problem["groups"], key=lambda group: group["id"])
+    problem["exclude"] = sorted(sorted(pair) for pair in problem["exclude"])
+    if problem["previous_assignment"] is not None:
+        problem["previous_assignment"] = sorted(problem["previous_assignment"], key=lambda a: a["student_id"])
+    problem["solver"] = config.model_dump(mode="json", exclude=RESULT_NEUTRAL_SETTINGS)
+    canonical = json.dumps(problem, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+class ResultCache:
+    """
+    Bounded LRU of solve results keyed by problem_key, optionally backed by a
+    SQLite file so results survive restarts and are shared between CLI calls.
+
+    Entries older than `ttl` seconds are treated as missing. The in-memory LRU
+    holds at most `maxsize` results; the database is pruned of expired rows
+    on every write.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = None, path: Optional[str] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries: "OrderedDict[str, Tuple[float, ProblemOutput]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, created REAL NOT NULL, output TEXT NOT NULL)"
+            )
+            self.db.commit()
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl is not None and now - created > self.ttl
+
+    def get(self, key: str) -> Optional[ProblemOutput]:
+        """The cached result with its cache info filled in, or None."""
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self._expired(entry[0], now):
+                del self.entries[key]
+                entry = None
+            if entry is not None:
+                self.entries.move_to_end(key)
+            elif self.db is not None:
+                row = self.db.execute("SELECT created, output FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None and not self._expired(row[0], now):
+                    entry = (row[0], ProblemOutput.model_validate_json(row[1]))
+                    self._remember(key, entry)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        created, output = entry
+        return output.model_copy(update={"cache": CacheInfo(key=key, hit=True, age=now - created)})
+
+    def put(self, key: str, output: ProblemOutput) -> None:
+        created = time.time()
+        output = output.model_copy(update={"cache": None})
+        with self.lock:
+            self._remember(key, (created, output))
+            if self.db is not None:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO results (key, created, output) VALUES (?, ?, ?)",
+                    (key, created, output.model_dump_json()),
+                )
+                if self.ttl is not None:
+                    self.db.execute("DELETE FROM results WHERE created < ?", (created - self.ttl,))
+                self.db.commit()
+
+    def _remember(self, key: str, entry: Tuple[float, ProblemOutput]) -> None:
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.entries)
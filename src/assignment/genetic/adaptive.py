@@ -0,0 +1,111 @@
+import math
+import random
+from typing import Dict, List, Sequence
+from ..models import SolverConfig
+
+CROSSOVER_ARMS = ("uniform", "group", "none")
+MUTATION_ARMS = ("swap", "move", "none")
+
+# Population and generation budgets sized from problem dimensions
+MIN_POPULATION = 40
+MAX_POPULATION = 300
+MIN_GENERATIONS = 100
+MAX_GENERATIONS = 5000
+ELITE_SHARE = 0.05
+
+def adaptive_config(config: SolverConfig, num_students: int, num_groups: int) -> SolverConfig:
+    """
+    Copy of config with population_size and generations sized from the
+    problem, unless they were set explicitly.
+
+    The population grows with the square root of the number of students;
+    the generation budget with the square root of the search space's
+    log-size (students x log2 groups), so small problems stop early and
+    large ones get more generations.
+    """
+    update = {}
+    if config.population_size is None:
+        update["population_size"] = min(MAX_POPULATION, max(MIN_POPULATION, round(8 * math.sqrt(num_students))))
+    if "generations" not in config.model_fields_set:
+        space = num_students * math.log2(max(2, num_groups))
+        update["generations"] = min(MAX_GENERATIONS, max(MIN_GENERATIONS, round(20 * math.sqrt(space))))
+    return config.model_copy(update=update)
+
+def adaptive_elitism(population_size: int) -> int:
+    return max(2, round(ELITE_SHARE * population_size))
+
+class ProbabilityMatching:
+    """
+    Adaptive choice between operators by probability matching.
+
+    Each arm's quality is an exponential moving average of its success rate
+    (children fitter than both parents); arms are drawn with probability
+    min_probability plus a share of the rest proportional to their quality,
+    so no operator is ever switched off entirely.
+    """
+
+    def __init__(self, arms: Sequence[str], decay: float = 0.1, min_probability: float = 0.05):
+        self.arms = tuple(arms)
+        self.decay = decay
+        self.min_probability = min_probability
+        self.quality: Dict[str, float] = {arm: 1.0 for arm in self.arms}
+        self.uses: Dict[str, int] = {arm: 0 for arm in self.arms}
+        self.successes: Dict[str, int] = {arm: 0 for arm in self.arms}
+        self.weights: List[float] = self._weights()
+
+    def _weights(self) -> List[float]:
+        total = sum(self.quality.values())
+        spare = 1.0 - self.min_probability * len(self.arms)
+        if total <= 0:
+            return [1.0 / len(self.arms)] * len(self.arms)
+        return [self.min_probability + spare * self.quality[arm] / total for arm in self.arms]
+
+    def probabilities(self) -> Dict[str, float]:
+        return dict(zip(self.arms, self.weights))
+
+    def choose(self, rng: random.Random) -> str:
+        return rng.choices(self.arms, self.weights)[0]
+
+    def credit(self, outcomes: Dict[str, List[bool]]) -> None:
+        """Update qualities with the successes of one generation, per arm."""
+        for arm, results in outcomes.items():
+            if not results:
+                continue
+            rate = sum(results) / len(results)
+            self.quality[arm] += self.decay * (rate - self.quality[arm])
+            self.uses[arm] += len(results)
+            self.successes[arm] += sum(results)
+        self.weights = self._weights()
+
+class OperatorControl:
+    """
+    Online control of the crossover and mutation operators of a Population.
+
+    Every child draws a crossover (uniform, group or none, i.e. a copy of the
+    first parent) and a mutation (swap, move to another possible group or
+    none); after the generation is scored, both arms are credited with
+    whether the child beat both parents. The crossover and mutation rates are
+    the probabilities of drawing any operator other than none.
+    """
+
+    def __init__(self):
+        self.crossover = ProbabilityMatching(CROSSOVER_ARMS)
+        self.mutation = ProbabilityMatching(MUTATION_ARMS)
+
+    @property
+    def crossover_rate(self) -> float:
+        return 1.0 - self.crossover.probabilities()["none"]
+
+    @property
+    def mutation_rate(self) -> float:
+        return 1.0 - self.mutation.probabilities()["none"]
+
+    def credit(self, children: List[tuple]) -> None:
+        """children holds (crossover arm, mutation arm, succeeded) per child of a generation."""
+        crossover: Dict[str, List[bool]] = {arm: [] for arm in CROSSOVER_ARMS}
+        mutation: Dict[str, List[bool]] = {arm: [] for arm in MUTATION_ARMS}
+        for crossover_arm, mutation_arm, succeeded in children:
+            crossover[crossover_arm].append(succeeded)
+            mutation[mutation_arm].append(succeeded)
+        self.crossover.credit(crossover)
+        self.mutation.credit(mutation)
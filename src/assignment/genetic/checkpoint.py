@@ -0,0 +1,98 @@
+import json
+import os
+import struct
+import tempfile
+import zlib
+from array import array
+from typing import Any, Dict, List, NamedTuple, Optional
+
+MAGIC = b"GACKPT"
+VERSION = 1
+_HEADER = struct.Struct("<6sBI")  # magic, version, JSON header length
+
+class Checkpoint(NamedTuple):
+    """Population state of one GA run."""
+    generation: int
+    seed: Optional[int]
+    rng_state: tuple  # random.Random.getstate()
+    best_fitness: float
+    initial_fitness: float
+    num_students: int
+    genes: List[array]  # one int array per individual
+    fitnesses: List[float]
+    parameters: Dict[str, Any]  # settings of the run that wrote it, for reference
+
+def checkpoint_path(directory: str, problem_key: str, parts: int, run_index: int) -> str:
+    """File of a run (task) of a problem solved in `parts` parts."""
+    return os.path.join(directory, f"{problem_key}-{parts}-{run_index}.ckpt")
+
+def save_checkpoint(path: str, checkpoint: Checkpoint) -> None:
+    """
+    Write the checkpoint atomically (through a uniquely named temporary file
+    in the same directory), so a crash mid-write leaves the previous
+    checkpoint intact and concurrent solves of the same problem never
+    publish a mix of each other's writes.
+
+    Layout: magic, version and header length, a JSON header with the
+    scalars, RNG state and parameters, then one zlib stream holding the
+    fitnesses (doubles) followed by every individual's genes (int32).
+    """
+    version, state, gauss = checkpoint.rng_state
+    header = json.dumps({
+        "generation": checkpoint.generation,
+        "seed": checkpoint.seed,
+        "rng_state": [version, list(state), gauss],
+        "best_fitness": checkpoint.best_fitness,
+        "initial_fitness": checkpoint.initial_fitness,
+        "num_students": checkpoint.num_students,
+        "individuals": len(checkpoint.genes),
+        "parameters": checkpoint.parameters,
+    }).encode()
+    payload = array('d', checkpoint.fitnesses).tobytes() + b"".join(
+        (genes if isinstance(genes, array) else array('i', genes)).tobytes() for genes in checkpoint.genes
+    )
+    directory, name = os.path.split(path)
+    with tempfile.NamedTemporaryFile(dir=directory or ".", prefix=f"{name}.", suffix=".tmp", delete=False) as f:
+        try:
+            f.write(_HEADER.pack(MAGIC, VERSION, len(header)))
+            f.write(header)
+            f.write(zlib.compress(payload, 1))
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, path)
+
+def load_checkpoint(path: str) -> Checkpoint:
+    """Read a checkpoint written by save_checkpoint; raises ValueError for other files."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        raise ValueError(f"{path} is not a GA checkpoint")
+    magic, version, length = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} GA checkpoint")
+    header = json.loads(data[_HEADER.size:_HEADER.size + length])
+    payload = zlib.decompress(data[_HEADER.size + length:])
+
+    individuals = header["individuals"]
+    num_students = header["num_students"]
+    fitnesses = array('d')
+    fitnesses.frombytes(payload[:individuals * fitnesses.itemsize])
+    genes = array('i')
+    genes.frombytes(payload[individuals * fitnesses.itemsize:])
+    if len(genes) != individuals * num_students:
+        raise ValueError(f"{path} is truncated")
+
+    version, state, gauss = header["rng_state"]
+    return Checkpoint(
+        generation=header["generation"],
+        seed=header["seed"],
+        rng_state=(version, tuple(state), gauss),
+        best_fitness=header["best_fitness"],
+        initial_fitness=header["initial_fitness"],
+        num_students=num_students,
+        genes=[genes[i * num_students:(i + 1) * num_students] for i in range(individuals)],
+        fitnesses=list(fitnesses),
+        parameters=header["parameters"],
+    )
@@ -1,47 +1,139 @@
 import random
-from typing import Dict, List
-from ..models import ProblemInput
+from array import array
+from typing import List, Optional, Sequence
+from .compiled import CompiledProblem
+from .incremental import FitnessState
 
 class Chromosome:
-    def __init__(self, genes: Dict[int, int]):
+    """
+    One assignment: genes[s] is the dense group index of dense student s.
+
+    Genes are a compact C int array; student and group ids are only looked up
+    when formatting the final output. When a FitnessState is attached it
+    shares the gene array and tracks every move. `hard` is the number of
+    hard-constraint violations behind the fitness, None until scored.
+    """
+
+    __slots__ = ("genes", "fitness", "hard", "state")
+
+    def __init__(self, genes: array, state: Optional[FitnessState] = None):
         self.genes = genes
         self.fitness: float = float('inf')
+        self.hard: Optional[int] = None
+        # Cached group aggregates; when present they track every move and hold the fitness
+        self.state = state
+        if state is not None:
+            self.fitness = state.fitness
+            self.hard = state.hard
 
     @classmethod
-    def random_initialization(cls, problem: ProblemInput) -> 'Chromosome':
+    def random_initialization(cls, problem: CompiledProblem, rng: Optional[random.Random] = None) -> 'Chromosome':
         """Create a size-balanced random assignment respecting possible_groups."""
-        genes = {}
-        
-        group_sizes = {g.id: g.size for g in problem.groups}
-        remaining = group_sizes.copy()
-
-        student_map = {s.id: s for s in problem.students}
-        student_ids = [s.id for s in problem.students]
-        random.shuffle(student_ids)
-        student_ids.sort(key=lambda s_id: len(student_map[s_id].possible_groups))
-
-        fallback_group = problem.groups[0].id if problem.groups else 0
-
-        for s_id in student_ids:
-            student = student_map[s_id]
-            if not student.possible_groups:
-                genes[s_id] = fallback_group
-                continue
-
-            feasible = [g_id for g_id in student.possible_groups if remaining.get(g_id, 0) > 0]
-            if feasible:
-                # Prefer groups with more remaining capacity, tie-break randomly
-                max_remaining = max(remaining[g_id] for g_id in feasible)
-                best = [g_id for g_id in feasible if remaining[g_id] == max_remaining]
-                chosen = random.choice(best)
+        rng = rng or random
+        genes = [0] * problem.num_students
+        remaining = problem.group_sizes.copy()
+        remaining.extend([0] * (problem.total_groups - problem.num_groups))
+        _place_students(problem, genes, list(range(problem.num_students)), remaining, rng)
+        return cls(array('i', genes))
+
+    @classmethod
+    def from_previous(cls, problem: CompiledProblem, rng: Optional[random.Random] = None) -> 'Chromosome':
+        """
+        Repair the problem's previous assignment to the current problem.
+
+        Students keep their previous group while it is still among their
+        possible_groups and within the group size (random members leave groups
+        that shrank); everyone else is placed as in random_initialization.
+        """
+        rng = rng or random
+        genes = [0] * problem.num_students
+        remaining = problem.group_sizes.copy()
+        remaining.extend([0] * (problem.total_groups - problem.num_groups))
+
+        members: List[List[int]] = [[] for _ in range(problem.total_groups)]
+        unplaced = []
+        for s, g in enumerate(problem.previous):
+            if g >= 0 and problem.is_possible(s, g):
+                members[g].append(s)
             else:
-                chosen = random.choice(student.possible_groups)
+                unplaced.append(s)
+
+        for g, students in enumerate(members):
+            if len(students) > remaining[g]:
+                rng.shuffle(students)
+                unplaced.extend(students[remaining[g]:])
+                del students[remaining[g]:]
+            for s in students:
+                genes[s] = g
+            remaining[g] -= len(students)
 
-            genes[s_id] = chosen
-            if chosen in remaining:
-                remaining[chosen] -= 1
-                
-        return cls(genes)
+        _place_students(problem, genes, unplaced, remaining, rng)
+        return cls(array('i', genes))
+
+    @classmethod
+    def from_assigned(cls, assigned: Sequence[int]) -> 'Chromosome':
+        """Build a chromosome from a dense group index per student index."""
+        return cls(array('i', assigned))
 
     def copy(self) -> 'Chromosome':
-        return Chromosome(self.genes.copy())
+        if self.state is not None:
+            state = self.state.copy()
+            clone = Chromosome(state.assigned, state)
+        else:
+            clone = Chromosome(self.genes[:])
+        clone.fitness = self.fitness
+        clone.hard = self.hard
+        return clone
+
+    def move(self, s: int, g: int) -> None:
+        """Reassign student s to group g (dense indices), updating cached aggregates."""
+        if self.state is not None:
+            self.state.move(s, g)
+            self.fitness = self.state.fitness
+            self.hard = self.state.hard
+        else:
+            self.fitness = float('inf')
+            self.hard = None
+        self.genes[s] = g
+
+    def swap(self, s1: int, s2: int) -> None:
+        """Exchange the groups of students s1 and s2 (dense indices)."""
+        genes = self.genes
+        g1, g2 = genes[s1], genes[s2]
+        if self.state is not None:
+            self.state.swap(s1, s2)
+            self.fitness = self.state.fitness
+            self.hard = self.state.hard
+        else:
+            self.fitness = float('inf')
+            self.hard = None
+        genes[s1], genes[s2] = g2, g1
+
+def _place_students(
+    problem: CompiledProblem,
+    genes: List[int],
+    students: List[int],
+    remaining: List[int],
+    rng,
+) -> None:
+    """Assign the given students (dense indices), most constrained first, preferring the emptiest groups."""
+    rng.shuffle(students)
+    students.sort(key=lambda s: len(problem.possible[s]))
+
+    for s in students:
+        possible = problem.possible[s]
+        if not possible:
+            genes[s] = problem.fallback_group
+            continue
+
+        feasible = [g for g in possible if remaining[g] > 0]
+        if feasible:
+            # Prefer groups with more remaining capacity, tie-break randomly
+            max_remaining = max(remaining[g] for g in feasible)
+            best = [g for g in feasible if remaining[g] == max_remaining]
+            chosen = rng.choice(best)
+        else:
+            chosen = rng.choice(possible)
+
+        genes[s] = chosen
+        remaining[chosen] -= 1
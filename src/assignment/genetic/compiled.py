@@ -0,0 +1,212 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from ..models import ProblemInput, CriterionType
+
+SCALING_FACTOR = 10000
+HARD_CONSTRAINT_PENALTY = 1e12  # Very high penalty for hard constraints
+
+class CriterionPlan(NamedTuple):
+    """One criterion config of a group, resolved against the value columns."""
+    kind: CriterionType
+    column: int
+    target: int  # MINIMIZE target sum or PREREQUISITE threshold, already scaled
+
+class GroupPlan(NamedTuple):
+    """All configs of a single criterion within a group (they share one group sum)."""
+    column: int
+    criteria: List[CriterionPlan]
+
+class CompiledProblem:
+    """
+    Dense, precomputed view of a ProblemInput.
+
+    Built once per solve and shared by fitness evaluation, the operators and the
+    stats computation, so none of them has to rebuild lookup tables per call.
+    Students and groups are addressed by dense indices; group ids referenced only
+    through possible_groups get indices after the configured groups so every
+    gene maps to an index.
+    """
+
+    def __init__(self, problem: ProblemInput):
+        self.problem = problem
+        students = problem.student_columns()
+
+        # Students
+        self.student_ids: List[int] = list(students.ids)
+        self.student_index: Dict[int, int] = {s_id: i for i, s_id in enumerate(self.student_ids)}
+        self.num_students = len(self.student_ids)
+
+        # Groups (configured first, then groups only referenced by students)
+        self.group_ids: List[int] = [g.id for g in problem.groups]
+        self.group_index: Dict[int, int] = {g_id: i for i, g_id in enumerate(self.group_ids)}
+        self.num_groups = len(self.group_ids)
+        self.group_sizes: List[int] = [g.size for g in problem.groups]
+        self.fallback_group = self._intern_group(problem.groups[0].id if problem.groups else 0)
+        self.possible: List[List[int]] = [
+            [self._intern_group(g_id) for g_id in possible_groups] for possible_groups in students.possible_groups
+        ]
+        self.possible_masks: List[int] = [self._mask(groups) for groups in self.possible]
+
+        # Criterion value columns, raw and pre-scaled
+        self.criteria: List[str] = []
+        self.criterion_index: Dict[str, int] = {}
+        for g in problem.groups:
+            for c_name in g.criteria:
+                if c_name not in self.criterion_index:
+                    self.criterion_index[c_name] = len(self.criteria)
+                    self.criteria.append(c_name)
+        self.raw_values: List[List[float]] = [
+            [values.get(c_name, 0) for values in students.values] for c_name in self.criteria
+        ]
+        self.values: List[List[int]] = [
+            [int(v * SCALING_FACTOR) for v in column] for column in self.raw_values
+        ]
+        self.global_means: List[float] = [
+            sum(column) / self.num_students if self.num_students else 0.0
+            for column in self.raw_values
+        ]
+
+        # Per-group criterion plans
+        self.group_plans: List[List[GroupPlan]] = []
+        num_criteria = 0
+        for g in problem.groups:
+            plans = []
+            for c_name, configs in g.criteria.items():
+                column = self.criterion_index[c_name]
+                resolved = []
+                for c_config in configs:
+                    if c_config.type in (CriterionType.MINIMIZE, CriterionType.PULL):
+                        num_criteria += 1
+                    if c_config.type == CriterionType.MINIMIZE:
+                        target = int(self.global_means[column] * g.size * SCALING_FACTOR)
+                        resolved.append(CriterionPlan(c_config.type, column, target))
+                    elif c_config.type == CriterionType.PULL:
+                        resolved.append(CriterionPlan(c_config.type, column, 0))
+                    elif c_config.type == CriterionType.PREREQUISITE and c_config.min_ratio is not None:
+                        threshold = int(c_config.min_ratio * SCALING_FACTOR)
+                        resolved.append(CriterionPlan(c_config.type, column, threshold))
+                if resolved:
+                    plans.append(GroupPlan(column, resolved))
+            self.group_plans.append(plans)
+        self.num_criteria = num_criteria
+
+        # Exclusions: index pairs (both students present) and per-student adjacency
+        self.exclude_pairs: List[Tuple[int, int]] = []
+        self.self_exclusions = 0
+        self.exclusions: List[List[int]] = [[] for _ in range(self.num_students)]
+        for pair in problem.exclude:
+            if len(pair) < 2:
+                continue
+            a = self.student_index.get(pair[0])
+            b = self.student_index.get(pair[1])
+            if a is None or b is None:
+                continue
+            self.exclude_pairs.append((a, b))
+            if a == b:
+                self.self_exclusions += 1
+            else:
+                self.exclusions[a].append(b)
+                self.exclusions[b].append(a)
+
+        # Rankings, pre-weighted per student and group index
+        self.has_rankings = any(students.rankings)
+        if self.num_criteria == 0:
+            self.ranking_weight = 1.0
+        else:
+            ranking_percentage = min(problem.ranking_percentage, 99.99)
+            self.ranking_weight = (ranking_percentage * self.num_criteria) / (100 - ranking_percentage)
+        self.weighted_ranking_scale = int(SCALING_FACTOR * self.ranking_weight)
+        self.ranking_base = self.weighted_ranking_scale * self.num_students
+        self.rankings: List[Optional[Dict[int, float]]] = [rankings or None for rankings in students.rankings]
+        self.ranking_values: List[Optional[List[int]]] = [
+            [int(rankings.get(g_id, 0.0) * self.weighted_ranking_scale) for g_id in self.group_ids]
+            if rankings else None
+            for rankings in self.rankings
+        ]
+
+        # Previous assignment (dense group index, -1 for students without a usable one)
+        self.previous: Optional[List[int]] = None
+        if problem.previous_assignment is not None:
+            previous_groups = {a.student_id: a.group_id for a in problem.previous_assignment}
+            self.previous = [
+                self.group_index.get(previous_groups.get(s_id), -1) for s_id in self.student_ids
+            ]
+        self.change_penalty = int(problem.change_penalty * SCALING_FACTOR) if self.previous is not None else 0
+
+    def subproblem(self, students: List[int], groups: List[int]) -> 'CompiledProblem':
+        """
+        The problem restricted to the given students and groups (ascending
+        dense indices, so configured groups stay first), e.g. a connected
+        component. Criterion targets, global means and the ranking weight
+        stay those of the whole problem, so the fitnesses of a partition's
+        subproblems add up to the fitness of the whole assignment, apart
+        from size penalties of groups no student can join. The ProblemInput
+        is not carried over (`problem` is None).
+        """
+        sub = CompiledProblem.__new__(CompiledProblem)
+        sub.problem = None
+        student_map = {s: i for i, s in enumerate(students)}
+        group_map = {g: i for i, g in enumerate(groups)}
+
+        sub.student_ids = [self.student_ids[s] for s in students]
+        sub.student_index = {s_id: i for i, s_id in enumerate(sub.student_ids)}
+        sub.num_students = len(students)
+
+        sub.group_ids = [self.group_ids[g] for g in groups]
+        sub.group_index = {g_id: i for i, g_id in enumerate(sub.group_ids)}
+        sub.num_groups = sum(1 for g in groups if g < self.num_groups)
+        sub.group_sizes = [self.group_sizes[g] for g in groups[:sub.num_groups]]
+        sub.fallback_group = group_map.get(self.fallback_group, 0)
+        sub.possible = [[group_map[g] for g in self.possible[s]] for s in students]
+        sub.possible_masks = [self._mask(possible) for possible in sub.possible]
+
+        sub.criteria = self.criteria
+        sub.criterion_index = self.criterion_index
+        sub.raw_values = [[column[s] for s in students] for column in self.raw_values]
+        sub.values = [[column[s] for s in students] for column in self.values]
+        sub.global_means = self.global_means
+        sub.group_plans = [self.group_plans[g] for g in groups[:sub.num_groups]]
+        sub.num_criteria = self.num_criteria
+
+        sub.exclude_pairs = [(student_map[a], student_map[b]) for a, b in self.exclude_pairs if a in student_map]
+        sub.self_exclusions = sum(1 for a, b in sub.exclude_pairs if a == b)
+        sub.exclusions = [[student_map[t] for t in self.exclusions[s]] for s in students]
+
+        sub.has_rankings = self.has_rankings
+        sub.ranking_weight = self.ranking_weight
+        sub.weighted_ranking_scale = self.weighted_ranking_scale
+        sub.ranking_base = self.weighted_ranking_scale * sub.num_students
+        sub.rankings = [self.rankings[s] for s in students]
+        sub.ranking_values = [
+            [values[g] for g in groups] if values is not None else None
+            for values in (self.ranking_values[s] for s in students)
+        ]
+
+        sub.previous = None
+        if self.previous is not None:
+            sub.previous = [group_map.get(self.previous[s], -1) for s in students]
+        sub.change_penalty = self.change_penalty
+        return sub
+
+    @property
+    def total_groups(self) -> int:
+        """Number of group indices, including groups only referenced by students."""
+        return len(self.group_ids)
+
+    def _intern_group(self, g_id: int) -> int:
+        index = self.group_index.get(g_id)
+        if index is None:
+            index = len(self.group_ids)
+            self.group_index[g_id] = index
+            self.group_ids.append(g_id)
+        return index
+
+    @staticmethod
+    def _mask(groups: List[int]) -> int:
+        mask = 0
+        for g in groups:
+            mask |= 1 << g
+        return mask
+
+    def is_possible(self, student: int, group: int) -> bool:
+        """Whether the student (dense index) may be placed in the group (dense index)."""
+        return bool(self.possible_masks[student] >> group & 1)
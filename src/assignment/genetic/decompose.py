@@ -0,0 +1,71 @@
+from typing import Dict, List, NamedTuple, Optional, Sequence
+from .compiled import CompiledProblem, HARD_CONSTRAINT_PENALTY
+
+class Part(NamedTuple):
+    """One independent subproblem: its students and groups as dense indices of the whole problem."""
+    students: List[int]
+    groups: List[int]
+    problem: CompiledProblem
+
+class Decomposition(NamedTuple):
+    parts: List[Part]  # largest first
+    idle_groups: List[int]  # configured groups no student can join; they stay empty
+    idle_penalty: float  # their size violations, part of every assignment's fitness
+
+    def merge(self, problem: CompiledProblem, assigned: Sequence[Sequence[int]]) -> List[int]:
+        """Dense assignment of the whole problem from one assignment (sub-problem indices) per part."""
+        merged = [problem.fallback_group] * problem.num_students
+        for part, part_assigned in zip(self.parts, assigned):
+            for s, g in zip(part.students, part_assigned):
+                merged[s] = part.groups[g]
+        return merged
+
+def _find(parent: List[int], node: int) -> int:
+    root = node
+    while parent[root] != root:
+        root = parent[root]
+    while parent[node] != root:
+        parent[node], node = root, parent[node]
+    return root
+
+def decompose(problem: CompiledProblem) -> Optional[Decomposition]:
+    """
+    Split the problem into connected components of the graph linking each
+    student to its possible groups (the fallback group for students without
+    any) and to its excluded partners.
+
+    No move, constraint or objective couples two components: group sizes,
+    criteria and exclusions only involve one component's students, and the
+    MINIMIZE targets and ranking weight of the whole problem are kept by
+    CompiledProblem.subproblem. Returns None when there is a single component.
+    """
+    n = problem.num_students
+    parent = list(range(n + problem.total_groups))
+
+    def union(a: int, b: int):
+        root_a, root_b = _find(parent, a), _find(parent, b)
+        if root_a != root_b:
+            parent[root_a] = root_b
+
+    for s, possible in enumerate(problem.possible):
+        for g in possible or (problem.fallback_group,):
+            union(s, n + g)
+    for a, b in problem.exclude_pairs:
+        union(a, b)
+
+    students: Dict[int, List[int]] = {}
+    groups: Dict[int, List[int]] = {}
+    for s in range(n):
+        students.setdefault(_find(parent, s), []).append(s)
+    for g in range(problem.total_groups):
+        groups.setdefault(_find(parent, n + g), []).append(g)
+
+    if len(students) < 2:
+        return None
+    parts = [
+        Part(members, groups[root], problem.subproblem(members, groups[root]))
+        for root, members in students.items()
+    ]
+    parts.sort(key=lambda part: -len(part.students))
+    idle = sorted(g for root, members in groups.items() if root not in students for g in members if g < problem.num_groups)
+    return Decomposition(parts, idle, sum(problem.group_sizes[g] for g in idle) * HARD_CONSTRAINT_PENALTY)
@@ -1,112 +1,84 @@
-from typing import Dict, List
+from typing import List, Sequence, Tuple
 from .chromosome import Chromosome
-from ..models import ProblemInput, CriterionType
+from .compiled import CompiledProblem, HARD_CONSTRAINT_PENALTY
+from .incremental import FitnessState
+from ..models import CriterionType
 
-SCALING_FACTOR = 10000
-HARD_CONSTRAINT_PENALTY = 1e12  # Very high penalty for hard constraints
+def compute_penalties(assigned: Sequence[int], problem: CompiledProblem) -> Tuple[int, int]:
+    """
+    Score a dense assignment (group index per student index).
 
-def evaluate_fitness(chromosome: Chromosome, problem: ProblemInput) -> float:
-    total_penalty = 0.0
-    student_map = {s.id: s for s in problem.students}
+    Returns (hard, soft): the number of hard-constraint violations and the
+    integer soft penalty. The fitness is hard * HARD_CONSTRAINT_PENALTY + soft.
+    """
+    hard = 0
+    soft = 0
 
-    criterion_names = set()
-    for g in problem.groups:
-        criterion_names.update(g.criteria.keys())
-
-    if problem.students:
-        global_means = {
-            c_name: sum(student_map[s.id].values.get(c_name, 0) for s in problem.students) / len(problem.students)
-            for c_name in criterion_names
-        }
-    else:
-        global_means = {c_name: 0.0 for c_name in criterion_names}
-    
     # 1. Group size constraints
-    group_counts = {g.id: 0 for g in problem.groups}
-    for g_id in chromosome.genes.values():
-        if g_id in group_counts:
-            group_counts[g_id] += 1
-            
-    for g in problem.groups:
-        diff = abs(group_counts[g.id] - g.size)
-        if diff > 0:
-            total_penalty += diff * HARD_CONSTRAINT_PENALTY
+    group_counts = [0] * problem.total_groups
+    groups_students: List[List[int]] = [[] for _ in range(problem.total_groups)]
+    for s, g in enumerate(assigned):
+        group_counts[g] += 1
+        groups_students[g].append(s)
+
+    for g, size in enumerate(problem.group_sizes):
+        hard += abs(group_counts[g] - size)
 
     # 2. Exclusion constraints
-    groups_students: Dict[int, List[int]] = {g.id: [] for g in problem.groups}
-    for s_id, g_id in chromosome.genes.items():
-        if g_id in groups_students:
-            groups_students[g_id].append(s_id)
-            
-    for pair in problem.exclude:
-        if len(pair) >= 2:
-            s1, s2 = pair[0], pair[1]
-            g1 = chromosome.genes.get(s1)
-            g2 = chromosome.genes.get(s2)
-            if g1 is not None and g1 == g2:
-                total_penalty += HARD_CONSTRAINT_PENALTY
+    for a, b in problem.exclude_pairs:
+        if assigned[a] == assigned[b]:
+            hard += 1
 
     # 3. Criteria constraints and objectives
-    for g in problem.groups:
-        student_ids = groups_students[g.id]
+    for g, plans in enumerate(problem.group_plans):
+        student_ids = groups_students[g]
         if not student_ids:
             continue
-            
-        for c_name, configs in g.criteria.items():
-            group_sum = sum(int(student_map[s_id].values.get(c_name, 0) * SCALING_FACTOR) for s_id in student_ids)
-            
+        size = problem.group_sizes[g]
+
+        for column, configs in plans:
+            values = problem.values[column]
+            group_sum = sum(values[s] for s in student_ids)
+
             for c_config in configs:
-                if c_config.type == CriterionType.MINIMIZE:
-                    target_sum = int(global_means.get(c_name, 0) * g.size * SCALING_FACTOR)
-                    penalty = abs(group_sum - target_sum)
-                    scaled_penalty = penalty * g.size
-                    total_penalty += scaled_penalty
+                if c_config.kind == CriterionType.MINIMIZE:
+                    soft += abs(group_sum - c_config.target) * size
 
-                elif c_config.type == CriterionType.PULL:
-                    max_val = 0
-                    for s_id in student_ids:
-                        max_val = max(max_val, int(student_map[s_id].values.get(c_name, 0) * SCALING_FACTOR))
-                    max_sum = max_val * g.size
-                    penalty = max_sum - group_sum
-                    scaled_penalty = penalty * g.size
-                    total_penalty += scaled_penalty
+                elif c_config.kind == CriterionType.PULL:
+                    max_val = max(0, max(values[s] for s in student_ids))
+                    soft += (max_val * size - group_sum) * size
 
-                elif c_config.type == CriterionType.PREREQUISITE:
-                    if c_config.min_ratio is not None:
-                        threshold = int(c_config.min_ratio * SCALING_FACTOR)
-                        for s_id in student_ids:
-                            val = int(student_map[s_id].values.get(c_name, 0) * SCALING_FACTOR)
-                            if val < threshold:
-                                total_penalty += HARD_CONSTRAINT_PENALTY
-                                break
+                elif c_config.kind == CriterionType.PREREQUISITE:
+                    threshold = c_config.target
+                    if any(values[s] < threshold for s in student_ids):
+                        hard += 1
 
     # 4. Rankings objective
-    has_rankings = any(s.rankings for s in problem.students)
-    if has_rankings:
-        num_criteria = 0
-        for g in problem.groups:
-            for c_name, configs in g.criteria.items():
-                for c_config in configs:
-                    if c_config.type == CriterionType.MINIMIZE or c_config.type == CriterionType.PULL:
-                        num_criteria += 1
-        
-        if num_criteria == 0:
-            ranking_weight = 1.0
-        else:
-            ranking_percentage = min(problem.ranking_percentage, 99.99)
-            ranking_weight = (ranking_percentage * num_criteria) / (100 - ranking_percentage)
-        
-        ranking_scale = SCALING_FACTOR
-        weighted_ranking_scale = int(ranking_scale * ranking_weight)
+    if problem.has_rankings:
         ranking_sum = 0
-        for s_id, g_id in chromosome.genes.items():
-            rankings = student_map[s_id].rankings
-            if not rankings:
-                continue
-            rank_val = rankings.get(g_id, 0.0)
-            ranking_sum += int(rank_val * weighted_ranking_scale)
-        ranking_penalty = weighted_ranking_scale * len(problem.students) - ranking_sum
-        total_penalty += ranking_penalty
-                                
-    chromosome.fitness = total_penalty
-    return total_penalty
+        for s, g in enumerate(assigned):
+            ranking_values = problem.ranking_values[s]
+            if ranking_values is not None:
+                ranking_sum += ranking_values[g]
+        soft += problem.ranking_base - ranking_sum
+
+    # 5. Changes from the previous assignment
+    if problem.change_penalty:
+        previous = problem.previous
+        changes = sum(1 for s, g in enumerate(assigned) if previous[s] >= 0 and previous[s] != g)
+        soft += changes * problem.change_penalty
+
+    return hard, soft
+
+def evaluate_fitness(chromosome: Chromosome, problem: CompiledProblem) -> float:
+    hard, soft = compute_penalties(chromosome.genes, problem)
+    chromosome.fitness = hard * HARD_CONSTRAINT_PENALTY + soft
+    chromosome.hard = hard
+    return chromosome.fitness
+
+def attach_state(chromosome: Chromosome, problem: CompiledProblem) -> float:
+    """Score a chromosome and keep its group aggregates for incremental moves."""
+    chromosome.state = FitnessState(problem, chromosome.genes)
+    chromosome.fitness = chromosome.state.fitness
+    chromosome.hard = chromosome.state.hard
+    return chromosome.fitness
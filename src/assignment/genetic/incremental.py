@@ -0,0 +1,225 @@
+from collections import Counter
+from typing import List, Optional, Sequence, Tuple
+from .compiled import CompiledProblem, HARD_CONSTRAINT_PENALTY
+from ..models import CriterionType
+
+class FitnessState:
+    """
+    Cached per-group aggregates of one assignment.
+
+    Keeps group counts, criterion sums, PULL value multisets and maxima,
+    prerequisite-violation counts, exclusion hits, the ranking sum and the
+    number of students moved from their previous group, so a
+    reassignment or swap updates the fitness in O(affected groups) instead of
+    rescoring every student. Totals always equal compute_penalties.
+
+    `assigned` is kept by reference and updated by every move, so a
+    chromosome's gene array can be shared with its state. Local search
+    attaches states; GA children only carry one when copied from such an
+    individual, and are otherwise scored by full evaluations.
+    """
+
+    def __init__(self, problem: CompiledProblem, assigned: Sequence[int]):
+        self.problem = problem
+        self.assigned = assigned
+        members: List[List[int]] = [[] for _ in range(problem.total_groups)]
+        for s, g in enumerate(self.assigned):
+            members[g].append(s)
+        self.counts = [len(group) for group in members]
+
+        # Aggregate group by group (the same passes compute_penalties makes)
+        self.sums: List[List[int]] = []
+        self.pull_values: List[List[Optional[Counter]]] = []
+        self.pull_max: List[List[int]] = []
+        self.violations: List[List[List[int]]] = []
+        for g, plans in enumerate(problem.group_plans):
+            sums, pull_values, pull_max, violations = [], [], [], []
+            for column, configs in plans:
+                values = problem.values[column]
+                group_values = [values[s] for s in members[g]]
+                sums.append(sum(group_values))
+                if any(c.kind == CriterionType.PULL for c in configs):
+                    pull_values.append(Counter(group_values))
+                    pull_max.append(max(0, max(group_values, default=0)))
+                else:
+                    pull_values.append(None)
+                    pull_max.append(0)
+                violations.append([
+                    sum(1 for v in group_values if v < c.target) if c.kind == CriterionType.PREREQUISITE else 0
+                    for c in configs
+                ])
+            self.sums.append(sums)
+            self.pull_values.append(pull_values)
+            self.pull_max.append(pull_max)
+            self.violations.append(violations)
+
+        self.exclusion_hits = sum(1 for a, b in problem.exclude_pairs if self.assigned[a] == self.assigned[b])
+        self.ranking_sum = 0
+        if problem.has_rankings:
+            for s, g in enumerate(self.assigned):
+                ranking_values = problem.ranking_values[s]
+                if ranking_values is not None:
+                    self.ranking_sum += ranking_values[g]
+        self.changes = 0
+        if problem.change_penalty:
+            previous = problem.previous
+            self.changes = sum(1 for s, g in enumerate(self.assigned) if previous[s] >= 0 and previous[s] != g)
+
+        self.group_penalties: List[Tuple[int, int]] = [
+            self._group_penalty(g) for g in range(problem.num_groups)
+        ]
+        self.group_hard = sum(h for h, _ in self.group_penalties)
+        self.group_soft = sum(s for _, s in self.group_penalties)
+
+    def copy(self) -> 'FitnessState':
+        clone = FitnessState.__new__(FitnessState)
+        clone.problem = self.problem
+        clone.assigned = self.assigned[:]
+        clone.counts = self.counts.copy()
+        clone.sums = [sums.copy() for sums in self.sums]
+        clone.pull_values = [
+            [values.copy() if values is not None else None for values in group_values]
+            for group_values in self.pull_values
+        ]
+        clone.pull_max = [maxima.copy() for maxima in self.pull_max]
+        clone.violations = [[counts.copy() for counts in group] for group in self.violations]
+        clone.exclusion_hits = self.exclusion_hits
+        clone.ranking_sum = self.ranking_sum
+        clone.changes = self.changes
+        clone.group_penalties = self.group_penalties.copy()
+        clone.group_hard = self.group_hard
+        clone.group_soft = self.group_soft
+        return clone
+
+    @property
+    def hard(self) -> int:
+        return self.group_hard + self.exclusion_hits
+
+    @property
+    def soft(self) -> int:
+        soft = self.group_soft
+        if self.problem.has_rankings:
+            soft += self.problem.ranking_base - self.ranking_sum
+        return soft + self.changes * self.problem.change_penalty
+
+    @property
+    def fitness(self) -> float:
+        return self.hard * HARD_CONSTRAINT_PENALTY + self.soft
+
+    def _add(self, s: int, g: int) -> None:
+        self.counts[g] += 1
+        if g >= self.problem.num_groups:
+            return
+        values = self.problem.values
+        for k, (column, configs) in enumerate(self.problem.group_plans[g]):
+            value = values[column][s]
+            self.sums[g][k] += value
+            pull_values = self.pull_values[g][k]
+            if pull_values is not None:
+                pull_values[value] += 1
+                if value > self.pull_max[g][k]:
+                    self.pull_max[g][k] = value
+            for i, c_config in enumerate(configs):
+                if c_config.kind == CriterionType.PREREQUISITE and value < c_config.target:
+                    self.violations[g][k][i] += 1
+
+    def _remove(self, s: int, g: int) -> None:
+        self.counts[g] -= 1
+        if g >= self.problem.num_groups:
+            return
+        values = self.problem.values
+        for k, (column, configs) in enumerate(self.problem.group_plans[g]):
+            value = values[column][s]
+            self.sums[g][k] -= value
+            pull_values = self.pull_values[g][k]
+            if pull_values is not None:
+                pull_values[value] -= 1
+                if not pull_values[value]:
+                    del pull_values[value]
+                    if value == self.pull_max[g][k]:
+                        self.pull_max[g][k] = max(0, max(pull_values, default=0))
+            for i, c_config in enumerate(configs):
+                if c_config.kind == CriterionType.PREREQUISITE and value < c_config.target:
+                    self.violations[g][k][i] -= 1
+
+    def _group_penalty(self, g: int) -> Tuple[int, int]:
+        """(hard, soft) contribution of a configured group."""
+        size = self.problem.group_sizes[g]
+        count = self.counts[g]
+        hard = abs(count - size)
+        soft = 0
+        if not count:
+            return hard, soft
+        for k, (_, configs) in enumerate(self.problem.group_plans[g]):
+            group_sum = self.sums[g][k]
+            for i, c_config in enumerate(configs):
+                if c_config.kind == CriterionType.MINIMIZE:
+                    soft += abs(group_sum - c_config.target) * size
+                elif c_config.kind == CriterionType.PULL:
+                    soft += (self.pull_max[g][k] * size - group_sum) * size
+                elif c_config.kind == CriterionType.PREREQUISITE:
+                    if self.violations[g][k][i]:
+                        hard += 1
+        return hard, soft
+
+    def _refresh(self, g: int) -> None:
+        if g >= self.problem.num_groups:
+            return
+        old_hard, old_soft = self.group_penalties[g]
+        hard, soft = self._group_penalty(g)
+        self.group_penalties[g] = (hard, soft)
+        self.group_hard += hard - old_hard
+        self.group_soft += soft - old_soft
+
+    def move(self, s: int, g: int) -> None:
+        """Reassign student s (dense index) to group g (dense index)."""
+        old = self.assigned[s]
+        if old == g:
+            return
+        assigned = self.assigned
+        for partner in self.problem.exclusions[s]:
+            if assigned[partner] == old:
+                self.exclusion_hits -= 1
+            elif assigned[partner] == g:
+                self.exclusion_hits += 1
+
+        ranking_values = self.problem.ranking_values[s]
+        if ranking_values is not None:
+            self.ranking_sum += ranking_values[g] - ranking_values[old]
+
+        if self.problem.change_penalty:
+            previous = self.problem.previous[s]
+            if previous >= 0:
+                self.changes += (g != previous) - (old != previous)
+
+        self._remove(s, old)
+        self._add(s, g)
+        assigned[s] = g
+        self._refresh(old)
+        self._refresh(g)
+
+    def swap(self, s1: int, s2: int) -> None:
+        """Exchange the groups of students s1 and s2."""
+        g1 = self.assigned[s1]
+        g2 = self.assigned[s2]
+        if g1 == g2:
+            return
+        self.move(s1, g2)
+        self.move(s2, g1)
+
+    def move_delta(self, s: int, g: int) -> float:
+        """Fitness change of reassigning s to g, leaving the state untouched."""
+        old = self.assigned[s]
+        before = self.fitness
+        self.move(s, g)
+        after = self.fitness
+        self.move(s, old)
+        return after - before
+
+    def swap_delta(self, s1: int, s2: int) -> float:
+        """Fitness change of swapping s1 and s2, leaving the state untouched."""
+        before = self.fitness
+        self.swap(s1, s2)
+        after = self.fitness
+        self.swap(s1, s2)
+        return after - before
@@ -0,0 +1,162 @@
+import multiprocessing
+import os
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Dict, List, Optional
+from .chromosome import Chromosome
+from .compiled import CompiledProblem
+from .runner import GARun, RunResult
+from ..models import SolverConfig
+
+TOPOLOGIES = ("ring", "all")
+TRANSPORTS = ("pipe", "socket")
+
+def migration_targets(topology: str, island: int, islands: int) -> List[int]:
+    """Islands that receive the migrants of the given island."""
+    if islands < 2:
+        return []
+    if topology == "ring":
+        return [(island + 1) % islands]
+    return [other for other in range(islands) if other != island]
+
+def _island_main(
+    channel,
+    problem: CompiledProblem,
+    config: SolverConfig,
+    island: int,
+    islands: int,
+    run_index: int,
+    seed: int,
+    show_progress: bool,
+    deadline: Optional[float],
+    cancel,
+    events,
+    started: Optional[float],
+    checkpoint: Optional[str],
+):
+    """
+    Island process: evolve in slices of migration_interval generations, sending
+    the top individuals to the coordinator and immigrating what it routes back.
+
+    `channel` is either a pipe connection or a (address, authkey) pair for the
+    socket transport. Progress events go to the `events` queue when given.
+    """
+    conn: Connection = Client(channel[0], authkey=channel[1]) if isinstance(channel, tuple) else channel
+    try:
+        conn.send(("hello", island))
+        run = GARun(
+            problem, config, run_index, islands, seed, show_progress, label="Island",
+            deadline=deadline, cancel=cancel, on_progress=events.put if events is not None else None,
+            started=started, checkpoint=checkpoint,
+        )
+        while True:
+            run.step(max(1, config.migration_interval))
+            if run.finished:
+                break
+            migrants = [c.genes for c in run.population.top(config.migration_size)]
+            with run.population.times.timed("migration"):
+                conn.send(("migrants", migrants))
+                incoming = conn.recv()
+            run.population.immigrate([Chromosome.from_assigned(assigned) for assigned in incoming])
+        conn.send(("done", run.result()))
+    finally:
+        conn.close()
+
+def run_islands(
+    problem: CompiledProblem,
+    config: SolverConfig,
+    seeds: List[int],
+    show_progress: bool = False,
+    deadline: Optional[float] = None,
+    cancel=None,
+    events=None,
+    started: Optional[float] = None,
+    run_indices: Optional[List[int]] = None,
+    checkpoints: Optional[List[str]] = None,
+) -> List[RunResult]:
+    """
+    Evolve one Population per seed in separate processes, exchanging the
+    top migration_size individuals along the configured topology every
+    migration_interval generations. Returns one RunResult per island, with
+    the island's index as run_index unless run_indices are given, and
+    checkpoints in the given files (one per island).
+    """
+    topology = config.topology
+    transport = config.transport
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Unknown migration topology {topology!r}; expected one of {', '.join(TOPOLOGIES)}")
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Unknown migration transport {transport!r}; expected one of {', '.join(TRANSPORTS)}")
+
+    islands = len(seeds)
+    run_indices = run_indices or list(range(islands))
+    checkpoints = checkpoints or [None] * islands
+    ctx = multiprocessing.get_context()
+    listener: Optional[Listener] = None
+    channels = []
+    conns: List[Connection] = []
+
+    if transport == "socket":
+        authkey = os.urandom(16)
+        listener = Listener(("127.0.0.1", 0), authkey=authkey)
+        channels = [(listener.address, authkey)] * islands
+    else:
+        for _ in range(islands):
+            parent, child = ctx.Pipe()
+            conns.append(parent)
+            channels.append(child)
+
+    processes = [
+        ctx.Process(
+            target=_island_main,
+            args=(
+                channels[i], problem, config, i, islands, run_indices[i], seeds[i], show_progress, deadline, cancel,
+                events, started, checkpoints[i],
+            ),
+            daemon=True,
+        )
+        for i in range(islands)
+    ]
+    for process in processes:
+        process.start()
+
+    try:
+        if listener is not None:
+            conns = [listener.accept() for _ in range(islands)]
+        else:
+            for child in channels:
+                child.close()
+
+        # Order connections by island index
+        by_island: Dict[int, Connection] = {}
+        for conn in conns:
+            _, island = conn.recv()
+            by_island[island] = conn
+
+        results: Dict[int, RunResult] = {}
+        active = set(range(islands))
+        while active:
+            waiting: Dict[int, list] = {}
+            for island in sorted(active):
+                kind, payload = by_island[island].recv()
+                if kind == "done":
+                    results[island] = payload
+                else:
+                    waiting[island] = payload
+            active = set(waiting)
+
+            incoming: Dict[int, list] = {island: [] for island in waiting}
+            for island, migrants in waiting.items():
+                for target in migration_targets(topology, island, islands):
+                    if target in incoming:
+                        incoming[target].extend(migrants)
+            for island in waiting:
+                by_island[island].send(incoming[island])
+
+        return [results[i] for i in range(islands)]
+    finally:
+        for conn in conns:
+            conn.close()
+        if listener is not None:
+            listener.close()
+        for process in processes:
+            process.join()
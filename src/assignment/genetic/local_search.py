@@ -0,0 +1,105 @@
+import random
+import time
+from typing import List, Optional
+from .chromosome import Chromosome
+from .compiled import CompiledProblem
+from .fitness import attach_state
+
+STRATEGIES = ("none", "first", "steepest")
+SWAP_PARTNERS = 8  # members of each candidate group tried as swap partners
+
+class LocalSearchStats:
+    """Counters accumulated over all local-search calls of a run."""
+
+    def __init__(self):
+        self.evaluations = 0  # move and swap deltas computed
+        self.moves = 0  # improving moves applied
+        self.gain = 0.0  # total fitness reduction
+        self.seconds = 0.0
+
+def _candidates(problem: CompiledProblem, assigned: List[int], members: List[List[int]], s: int, rng):
+    """Reassignments of s to its other possible groups, and swaps with sampled members of those groups."""
+    current = assigned[s]
+    for g in problem.possible[s]:
+        if g == current:
+            continue
+        yield g, None
+        partners = members[g]
+        if len(partners) > SWAP_PARTNERS:
+            partners = rng.sample(partners, SWAP_PARTNERS)
+        for partner in partners:
+            if problem.is_possible(partner, current):
+                yield g, partner
+
+def hill_climb(
+    chromosome: Chromosome,
+    problem: CompiledProblem,
+    strategy: str = "first",
+    deadline: Optional[float] = None,
+    rng: Optional[random.Random] = None,
+    stats: Optional[LocalSearchStats] = None,
+) -> None:
+    """
+    Improve a chromosome in place by reassignment and pairwise swap moves
+    that respect possible_groups, until no move improves or the monotonic
+    deadline passes.
+
+    Moves are scored as FitnessState deltas, so each costs O(affected groups).
+    "first" applies every improving move as soon as it is found; "steepest"
+    scans the whole neighbourhood and applies the best move per scan.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown local search strategy {strategy!r}; expected one of {', '.join(STRATEGIES)}")
+    if strategy == "none":
+        return
+    rng = rng or random
+    stats = stats if stats is not None else LocalSearchStats()
+    started = time.monotonic()
+    if chromosome.state is None:
+        attach_state(chromosome, problem)
+    state = chromosome.state
+    initial_fitness = chromosome.fitness
+
+    members: List[List[int]] = [[] for _ in range(problem.total_groups)]
+    for s, g in enumerate(state.assigned):
+        members[g].append(s)
+
+    def apply(s: int, g: int, partner: Optional[int]):
+        old = state.assigned[s]
+        members[old].remove(s)
+        members[g].append(s)
+        if partner is None:
+            chromosome.move(s, g)
+        else:
+            members[g].remove(partner)
+            members[old].append(partner)
+            chromosome.swap(s, partner)
+        stats.moves += 1
+
+    order = list(range(problem.num_students))
+    while True:
+        improved = timed_out = False
+        best_delta, best_move = 0.0, None
+        rng.shuffle(order)
+        for s in order:
+            if deadline is not None and time.monotonic() >= deadline:
+                timed_out = True
+                break
+            for g, partner in _candidates(problem, state.assigned, members, s, rng):
+                delta = state.move_delta(s, g) if partner is None else state.swap_delta(s, partner)
+                stats.evaluations += 1
+                if delta >= best_delta:
+                    continue
+                if strategy == "first":
+                    apply(s, g, partner)
+                    improved = True
+                    break
+                best_delta, best_move = delta, (s, g, partner)
+        if best_move is not None:
+            apply(*best_move)
+            improved = True
+        if timed_out or not improved:
+            break
+
+    stats.gain += initial_fitness - chromosome.fitness
+    stats.seconds += time.monotonic() - started
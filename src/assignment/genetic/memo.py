@@ -0,0 +1,41 @@
+import hashlib
+from array import array
+from collections import OrderedDict
+from typing import Optional, Sequence, Tuple
+
+class FitnessCache:
+    """
+    Bounded LRU map from assignment hash to (fitness, hard-constraint violations).
+
+    Keys are 128-bit BLAKE2b digests of the compact assignment vector, so an
+    entry costs a few dozen bytes regardless of the number of students.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.entries: "OrderedDict[bytes, Tuple[float, int]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(assigned: Sequence[int]) -> bytes:
+        data = assigned.tobytes() if isinstance(assigned, array) else array('i', assigned).tobytes()
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[Tuple[float, int]]:
+        scored = self.entries.get(key)
+        if scored is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return scored
+
+    def put(self, key: bytes, fitness: float, hard: int) -> None:
+        self.entries[key] = (fitness, hard)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -1,62 +1,229 @@
 import random
-from typing import List
-from .chromosome import Chromosome
-from ..models import ProblemInput
+from array import array
+from typing import List, Optional, Tuple
+from .chromosome import Chromosome, _place_students
+from .compiled import CompiledProblem
 
-def tournament_selection(population: List[Chromosome], k: int = 3) -> Chromosome:
+CROSSOVERS = ("uniform", "group")
+
+def tournament_selection(population: List[Chromosome], k: int = 3, rng: Optional[random.Random] = None) -> Chromosome:
     """Select the best individual from a random sample of k individuals."""
-    selection = random.sample(population, k)
+    rng = rng or random
+    selection = rng.sample(population, min(k, len(population)))
     return min(selection, key=lambda x: x.fitness)
 
-def uniform_crossover(parent1: Chromosome, parent2: Chromosome) -> Chromosome:
+def uniform_crossover(parent1: Chromosome, parent2: Chromosome, rng: Optional[random.Random] = None) -> Chromosome:
     """Create a child by randomly choosing genes from each parent."""
-    child_genes = {}
-    for s_id in parent1.genes.keys():
-        if random.random() < 0.5:
-            child_genes[s_id] = parent1.genes[s_id]
+    rng = rng or random
+    n = len(parent1.genes)
+    # One random bit per gene picks the parent; the selection runs in C-level iterators
+    bits = map(int, format(rng.getrandbits(n), f"0{n}b"))
+    return Chromosome(array('i', map(tuple.__getitem__, zip(parent1.genes, parent2.genes), bits)))
+
+def group_crossover(parent1: Chromosome, parent2: Chromosome, problem: CompiledProblem, rng: Optional[random.Random] = None) -> Chromosome:
+    """
+    Create a child that inherits whole groups: every configured group takes,
+    up to its size, the members it has in a randomly chosen parent. Students
+    claimed by no group (or by a full one) join either parent's group while it
+    has room, and the rest are placed by remaining capacity as in random
+    initialization, so group sizes are kept whenever possible.
+    """
+    rng = rng or random
+    num_groups = problem.num_groups
+    first = parent1.genes
+    second = parent2.genes
+    from_second = [rng.random() < 0.5 for _ in range(num_groups)]
+    remaining = problem.group_sizes.copy()
+    remaining.extend([0] * (problem.total_groups - num_groups))
+
+    child = [-1] * problem.num_students
+    for s in range(problem.num_students):
+        g1 = first[s]
+        g2 = second[s]
+        claim1 = g1 < num_groups and not from_second[g1] and remaining[g1] > 0
+        claim2 = g2 < num_groups and from_second[g2] and remaining[g2] > 0
+        if claim1 and claim2 and g1 != g2:
+            claim1 = rng.random() < 0.5
+        g = g1 if claim1 else g2 if claim2 else -1
+        if g >= 0:
+            child[s] = g
+            remaining[g] -= 1
+
+    leftover = []
+    for s, g in enumerate(child):
+        if g >= 0:
+            continue
+        g1 = first[s]
+        g2 = second[s]
+        if remaining[g1] > 0:
+            child[s] = g1
+            remaining[g1] -= 1
+        elif remaining[g2] > 0:
+            child[s] = g2
+            remaining[g2] -= 1
         else:
-            child_genes[s_id] = parent2.genes[s_id]
-    return Chromosome(child_genes)
+            leftover.append(s)
+
+    if leftover:
+        _place_students(problem, child, leftover, remaining, rng)
+    return Chromosome(array('i', child))
 
-def swap_mutation(chromosome: Chromosome, problem: ProblemInput, mutation_rate: float = 0.2) -> Chromosome:
+def swap_mutation(chromosome: Chromosome, problem: CompiledProblem, mutation_rate: float = 0.2, rng: Optional[random.Random] = None) -> Chromosome:
     """Mutate by swapping group assignments between two students."""
-    if random.random() > mutation_rate:
+    rng = rng or random
+    if rng.random() > mutation_rate:
         return chromosome
 
-    new_genes = chromosome.genes.copy()
-    student_ids = list(new_genes.keys())
-    
-    if len(student_ids) < 2:
+    if problem.num_students < 2:
         return chromosome
 
-    s1_id, s2_id = random.sample(student_ids, 2)
-    g1_id = new_genes[s1_id]
-    g2_id = new_genes[s2_id]
+    s1, s2 = rng.sample(range(problem.num_students), 2)
+    g1 = chromosome.genes[s1]
+    g2 = chromosome.genes[s2]
 
-    if g1_id == g2_id:
+    if g1 == g2 or not (problem.is_possible(s1, g2) and problem.is_possible(s2, g1)):
         return chromosome
 
-    student_map = {s.id: s for s in problem.students}
-    s1_possible = student_map[s1_id].possible_groups
-    s2_possible = student_map[s2_id].possible_groups
+    child = chromosome.copy()
+    child.swap(s1, s2)
+    return child
 
-    if g2_id in s1_possible and g1_id in s2_possible:
-        new_genes[s1_id] = g2_id
-        new_genes[s2_id] = g1_id
+def perturb(chromosome: Chromosome, problem: CompiledProblem, strength: float, rng: Optional[random.Random] = None) -> Chromosome:
+    """Copy of the chromosome with about strength * num_students size-preserving swaps applied."""
+    rng = rng or random
+    child = chromosome.copy()
+    if problem.num_students < 2:
+        return child
 
-    return Chromosome(new_genes)
+    genes = child.genes
+    for _ in range(max(1, round(strength * problem.num_students))):
+        s1, s2 = rng.sample(range(problem.num_students), 2)
+        g1 = genes[s1]
+        g2 = genes[s2]
+        if g1 != g2 and problem.is_possible(s1, g2) and problem.is_possible(s2, g1):
+            child.swap(s1, s2)
+    return child
 
-def random_mutation(chromosome: Chromosome, problem: ProblemInput, mutation_rate: float = 0.1) -> Chromosome:
+def random_mutation(chromosome: Chromosome, problem: CompiledProblem, mutation_rate: float = 0.1, rng: Optional[random.Random] = None) -> Chromosome:
     """Change one student's group assignment."""
-    if random.random() > mutation_rate:
+    rng = rng or random
+    if rng.random() > mutation_rate:
+        return chromosome
+
+    if not problem.num_students:
         return chromosome
 
-    new_genes = chromosome.genes.copy()
-    s_id = random.choice(list(new_genes.keys()))
-    
-    student_map = {s.id: s for s in problem.students}
-    possible = student_map[s_id].possible_groups
+    child = chromosome.copy()
+    s = rng.randrange(problem.num_students)
+
+    possible = problem.possible[s]
     if possible:
-        new_genes[s_id] = random.choice(possible)
-        
-    return Chromosome(new_genes)
+        child.move(s, rng.choice(possible))
+
+    return child
+
+def size_violations(assigned: List[int], problem: CompiledProblem) -> int:
+    """Total deviation of the configured groups from their sizes."""
+    counts = [0] * problem.total_groups
+    for g in assigned:
+        counts[g] += 1
+    return sum(abs(counts[g] - size) for g, size in enumerate(problem.group_sizes))
+
+def repair(chromosome: Chromosome, problem: CompiledProblem, rng: Optional[random.Random] = None) -> Tuple[bool, bool]:
+    """
+    Restore exact group sizes in place.
+
+    Students outside their possible_groups and the surplus of overfull groups
+    (students sharing the group with an excluded partner first) are moved to
+    groups with free places they may join, preferring groups without an
+    excluded partner. When none is free, a member of one of their possible
+    groups is first moved on to a free group it may join. Students that still
+    cannot be placed go back to their group.
+
+    Returns (changed, feasible): whether any student moved and whether every
+    configured group now has exactly its size.
+    """
+    rng = rng or random
+    assigned = list(chromosome.genes)
+    num_groups = problem.num_groups
+    # Groups only referenced through possible_groups have no size to keep
+    free = problem.group_sizes.copy()
+    free.extend([problem.num_students] * (problem.total_groups - num_groups))
+    members: List[List[int]] = [[] for _ in range(problem.total_groups)]
+    displaced = []
+    masks = problem.possible_masks
+    for s, g in enumerate(assigned):
+        if masks[s] and not masks[s] >> g & 1:
+            displaced.append(s)
+        else:
+            members[g].append(s)
+            free[g] -= 1
+
+    exclusions = problem.exclusions
+
+    def conflicts(s: int, g: int) -> int:
+        return sum(1 for partner in exclusions[s] if assigned[partner] == g)
+
+    for g in range(num_groups):
+        excess = -free[g]
+        if excess <= 0:
+            continue
+        group = members[g]
+        conflicted = [s for s in group if exclusions[s] and conflicts(s, g)]
+        if len(conflicted) >= excess:
+            evicted = rng.sample(conflicted, excess)
+        else:
+            others = set(group).difference(conflicted)
+            evicted = conflicted + rng.sample(sorted(others), excess - len(conflicted))
+        evicted_set = set(evicted)
+        members[g] = [s for s in group if s not in evicted_set]
+        displaced.extend(evicted)
+        free[g] = 0
+
+    if not displaced:
+        return False, all(free[g] == 0 for g in range(num_groups))
+
+    touched = list(displaced)
+
+    def place(s: int, g: int):
+        assigned[s] = g
+        members[g].append(s)
+        free[g] -= 1
+
+    rng.shuffle(displaced)
+    displaced.sort(key=lambda s: len(problem.possible[s]))
+    for s in displaced:
+        possible = problem.possible[s]
+        candidates = [g for g in possible if free[g] > 0]
+        if candidates:
+            # Configured groups first, then fewest excluded partners, then most free places
+            keys = [(g >= num_groups, conflicts(s, g) if exclusions[s] else 0, -free[g]) for g in candidates]
+            best_key = min(keys)
+            place(s, rng.choice([g for g, key in zip(candidates, keys) if key == best_key]))
+            continue
+
+        # Ejection chain of length one: make room in a possible group
+        placed = False
+        for g in rng.sample(possible, len(possible)):
+            for t in members[g]:
+                moves = [h for h in problem.possible[t] if h != g and free[h] > 0]
+                if moves:
+                    members[g].remove(t)
+                    free[g] += 1
+                    touched.append(t)
+                    place(t, rng.choice(moves))
+                    place(s, g)
+                    placed = True
+                    break
+            if placed:
+                break
+        if not placed:
+            place(s, assigned[s])
+
+    changed = False
+    genes = chromosome.genes
+    for s in touched:
+        if assigned[s] != genes[s]:
+            chromosome.move(s, assigned[s])
+            changed = True
+    return changed, all(free[g] == 0 for g in range(num_groups))
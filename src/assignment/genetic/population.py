@@ -1,48 +1,279 @@
-from typing import List
+import random
+import time
+from typing import Callable, Iterator, List, Optional, Sequence
+from .adaptive import OperatorControl
 from .chromosome import Chromosome
+from .memo import FitnessCache
+from .operators import (
+    CROSSOVERS, tournament_selection, uniform_crossover, group_crossover, swap_mutation, random_mutation, perturb,
+    repair, size_violations,
+)
+from .compiled import CompiledProblem
 from .fitness import evaluate_fitness
-from .operators import tournament_selection, uniform_crossover, swap_mutation, random_mutation
-from ..models import ProblemInput
+from .profiling import PhaseTimes
+from .seeding import constructive_seeds
+from .vectorized import VectorizedEvaluator, numpy_available
+
+ENGINES = ("auto", "python", "numpy")
 
 class Population:
-    def __init__(self, problem: ProblemInput, size: int = 100):
+    def __init__(
+        self,
+        problem: CompiledProblem,
+        size: int = 100,
+        engine: str = "auto",
+        seed: Optional[int] = None,
+        cache_size: int = 0,
+        warm_start: float = 0.0,
+        warm_start_perturbation: float = 0.05,
+        crossover: str = "uniform",
+        repair: bool = False,
+        adaptive: bool = False,
+        seeding: float = 0.0,
+        seeding_noise: float = 0.5,
+        individuals: Optional[List[Chromosome]] = None,
+        deadline: Optional[float] = None,
+    ):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown fitness engine {engine!r}; expected one of {', '.join(ENGINES)}")
+        if crossover not in CROSSOVERS:
+            raise ValueError(f"Unknown crossover {crossover!r}; expected one of {', '.join(CROSSOVERS)}")
+        if engine == "auto":
+            engine = "numpy" if numpy_available() else "python"
         self.problem = problem
         self.size = size
-        self.individuals: List[Chromosome] = [
-            Chromosome.random_initialization(problem) for _ in range(size)
-        ]
+        self.engine = engine
+        self.rng = random.Random(seed)
+        self.evaluator = VectorizedEvaluator(problem) if engine == "numpy" else None
+        self.cache = FitnessCache(cache_size) if cache_size > 0 else None
+        self.crossover = crossover
+        self.repair = repair
+        # Adaptive operator choice per child instead of the fixed crossover and swap mutation
+        self.control = OperatorControl() if adaptive else None
+        # Children whose group sizes are checked (only with repair or a capacity-preserving crossover)
+        self.track_feasibility = repair or crossover != "uniform"
+        self.children = 0
+        self.repaired = 0
+        self.infeasible = 0
+        # New individuals scored: the initial population, children and immigrants
+        self.evaluations = 0
+        self.times = PhaseTimes()
+        self.individuals: List[Chromosome] = []
+        if individuals is not None:
+            # Restored (e.g. from a checkpoint); individuals with a fitness are not rescored
+            self.individuals = individuals
+        else:
+            self._initialize(warm_start, warm_start_perturbation, seeding, seeding_noise, deadline)
+            self.evaluations += len(self.individuals)
         self.evaluate()
 
+    def _late(self, deadline: Optional[float]) -> bool:
+        """Whether initialization should stop: the monotonic deadline passed and there is an individual."""
+        return deadline is not None and bool(self.individuals) and time.monotonic() >= deadline
+
+    def _until(self, deadline: Optional[float], count: int, make: Callable[[], Chromosome]) -> Iterator[Chromosome]:
+        for _ in range(count):
+            if self._late(deadline):
+                return
+            yield make()
+
+    def _initialize(
+        self,
+        warm_start: float,
+        warm_start_perturbation: float,
+        seeding: float,
+        seeding_noise: float,
+        deadline: Optional[float] = None,
+    ):
+        """
+        Build the initial population. Once the monotonic deadline passes, no
+        further individuals are built: the population keeps the ones it has
+        (at least one), and the run stops before its first generation.
+        """
+        problem = self.problem
+        size = self.size
+        start = time.perf_counter()
+
+        # Warm start: the repaired previous assignment and perturbed variants of it
+        seeded = min(size, round(size * warm_start)) if problem.previous is not None else 0
+        if seeded:
+            base = Chromosome.from_previous(problem, self.rng)
+            self.individuals.append(base)
+            self.individuals.extend(self._until(
+                deadline, seeded - 1, lambda: perturb(base, problem, warm_start_perturbation, self.rng),
+            ))
+
+        # Constructive seeds: ranking-optimal assignments within sizes and prerequisites
+        constructed = min(size - seeded, round(size * seeding))
+        seeding_seconds = 0.0
+        if constructed and not self._late(deadline):
+            seeding_start = time.perf_counter()
+            self.individuals.extend(constructive_seeds(
+                problem, constructed, self.rng, noise=seeding_noise, perturbation=warm_start_perturbation,
+                deadline=deadline,
+            ))
+            seeding_seconds = time.perf_counter() - seeding_start
+            self.times.add("seeding", seeding_seconds)
+
+        self.individuals.extend(self._until(
+            deadline, size - seeded - constructed, lambda: Chromosome.random_initialization(problem, self.rng),
+        ))
+        self.times.add("initialization", time.perf_counter() - start - seeding_seconds)
+
     def evaluate(self):
+        start = time.perf_counter()
+        self._evaluate()
+        self.times.add("evaluation", time.perf_counter() - start)
+
+    def _evaluate(self):
+        # Individuals carrying cached aggregates are already scored by their moves,
+        # and unchanged copies keep their fitness
+        pending = []
         for individual in self.individuals:
+            if individual.state is not None:
+                individual.fitness = individual.state.fitness
+                individual.hard = individual.state.hard
+            elif individual.fitness == float('inf'):
+                pending.append(individual)
+        if not pending:
+            return
+
+        rows = [individual.genes for individual in pending]
+        if self.cache is None:
+            self._score(pending, rows)
+            return
+
+        # Score each distinct uncached assignment once
+        misses = {}
+        for individual, row in zip(pending, rows):
+            key = FitnessCache.key(row)
+            scored = self.cache.get(key)
+            if scored is not None:
+                individual.fitness, individual.hard = scored
+            elif key in misses:
+                misses[key][0].append(individual)
+            else:
+                misses[key] = ([individual], row)
+        if not misses:
+            return
+
+        self._score([group[0] for group, _ in misses.values()], [row for _, row in misses.values()])
+        for key, (group, _) in misses.items():
+            fitness, hard = group[0].fitness, group[0].hard
+            for individual in group[1:]:
+                individual.fitness, individual.hard = fitness, hard
+            self.cache.put(key, fitness, hard)
+
+    def _score(self, individuals: List[Chromosome], rows: List[Sequence[int]]):
+        if self.evaluator is not None:
+            for individual, (fitness, hard) in zip(individuals, self.evaluator.score_with_hard(rows)):
+                individual.fitness, individual.hard = fitness, hard
+            return
+        # Full evaluations: building a FitnessState costs about 2.4 full scores
+        # and most children are fresh crossover products. States are attached
+        # by local search only; copies of those individuals (elites, children
+        # without crossover) keep them, so their mutations are scored as deltas
+        # and skip this rescore.
+        for individual in individuals:
             evaluate_fitness(individual, self.problem)
 
     def evolve(self, crossover_rate: float = 0.8, mutation_rate: float = 0.2, elitism: int = 2):
+        """
+        Replace the population with the elite and new children. With adaptive
+        operator control the rates are ignored: every child draws its
+        crossover and mutation operators, which are credited once scored.
+        """
         new_population: List[Chromosome] = []
+        control = self.control
+        # (child, crossover arm, mutation arm, fitness of the fitter parent) for operator credit
+        drawn = []
+        clock = time.perf_counter
+        # Phase times of this generation, added once at the end
+        selection = crossover = mutation = feasibility = 0.0
         
         # Elitism
+        start = clock()
         self.individuals.sort(key=lambda x: x.fitness)
         new_population.extend([ind.copy() for ind in self.individuals[:elitism]])
+        selection += clock() - start
         
-        import random
         while len(new_population) < self.size:
             # Selection
-            parent1 = tournament_selection(self.individuals)
-            parent2 = tournament_selection(self.individuals)
+            start = clock()
+            parent1 = tournament_selection(self.individuals, rng=self.rng)
+            parent2 = tournament_selection(self.individuals, rng=self.rng)
+            selected = clock()
+            selection += selected - start
             
             # Crossover
-            if random.random() < crossover_rate:
-                child = uniform_crossover(parent1, parent2)
+            if control is not None:
+                crossover_arm = control.crossover.choose(self.rng)
+            elif self.rng.random() < crossover_rate:
+                crossover_arm = self.crossover
+            else:
+                crossover_arm = "none"
+            if crossover_arm == "group":
+                child = group_crossover(parent1, parent2, self.problem, self.rng)
+            elif crossover_arm == "uniform":
+                child = uniform_crossover(parent1, parent2, self.rng)
             else:
                 child = parent1.copy()
+            crossed = clock()
+            crossover += crossed - selected
             
             # Mutation
-            child = swap_mutation(child, self.problem, mutation_rate)
+            if control is None:
+                child = swap_mutation(child, self.problem, mutation_rate, self.rng)
+            else:
+                mutation_arm = control.mutation.choose(self.rng)
+                if mutation_arm == "swap":
+                    child = swap_mutation(child, self.problem, 1.0, self.rng)
+                elif mutation_arm == "move":
+                    child = random_mutation(child, self.problem, 1.0, self.rng)
+                drawn.append((child, crossover_arm, mutation_arm, min(parent1.fitness, parent2.fitness)))
+            mutated = clock()
+            mutation += mutated - crossed
+
+            # Feasibility
+            if self.track_feasibility:
+                self.children += 1
+                if self.repair:
+                    changed, feasible = repair(child, self.problem, self.rng)
+                    self.repaired += changed
+                else:
+                    feasible = size_violations(child.genes, self.problem) == 0
+                self.infeasible += not feasible
+                feasibility += clock() - mutated
             
             new_population.append(child)
             
+        self.times.add("selection", selection)
+        self.times.add("crossover", crossover)
+        self.times.add("mutation", mutation)
+        if self.track_feasibility:
+            self.times.add("repair", feasibility)
+        self.evaluations += len(new_population) - min(elitism, len(new_population))
         self.individuals = new_population
         self.evaluate()
+        if control is not None:
+            control.credit([
+                (crossover_arm, mutation_arm, child.fitness < parent_fitness)
+                for child, crossover_arm, mutation_arm, parent_fitness in drawn
+            ])
 
     def get_best(self) -> Chromosome:
         return min(self.individuals, key=lambda x: x.fitness)
+
+    def top(self, k: int) -> List[Chromosome]:
+        """The k fittest individuals, best first."""
+        return sorted(self.individuals, key=lambda x: x.fitness)[:k]
+
+    def immigrate(self, migrants: List[Chromosome]):
+        """Replace the worst individuals with migrants and score them."""
+        if not migrants:
+            return
+        self.individuals.sort(key=lambda x: x.fitness)
+        keep = max(0, len(self.individuals) - len(migrants))
+        self.individuals = self.individuals[:keep] + migrants[:len(self.individuals)]
+        self.evaluations += min(len(migrants), len(self.individuals))
+        self.evaluate()
@@ -0,0 +1,34 @@
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+class PhaseTimes:
+    """
+    Cumulative wall-clock seconds and call counts per solver phase.
+
+    Phases are free-form names; the GA uses initialization, seeding, selection,
+    crossover, mutation, repair, evaluation, local_search, migration,
+    checkpoint and reporting, and solve_assignment adds compile, stats and formatting.
+    Evolution phases are added once per generation, so their calls count
+    generations rather than children.
+    """
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+
+    def add(self, phase: str, seconds: float, calls: int = 1) -> None:
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+        self.calls[phase] = self.calls.get(phase, 0) + calls
+
+    @contextmanager
+    def timed(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start)
+
+    def merge(self, other: 'PhaseTimes') -> None:
+        for phase, seconds in other.seconds.items():
+            self.add(phase, seconds, other.calls[phase])
@@ -0,0 +1,338 @@
+import os
+import time
+from typing import Callable, List, NamedTuple, Optional, Sequence
+from tqdm import tqdm
+from .adaptive import OperatorControl, adaptive_elitism
+from .checkpoint import Checkpoint, load_checkpoint, save_checkpoint
+from .chromosome import Chromosome
+from .compiled import CompiledProblem
+from .fitness import compute_penalties
+from .local_search import LocalSearchStats, hill_climb
+from .population import Population
+from .profiling import PhaseTimes
+from ..models import SolverConfig
+
+# GA parameters
+POPULATION_SIZE = 120
+CROSSOVER_RATE = 1
+MUTATION_RATE = 0.28
+ELITISM = 6
+
+# Settings recorded in checkpoints for reference
+CHECKPOINT_PARAMETERS = {
+    "population_size", "generations", "adaptive", "crossover", "repair", "engine", "seeding", "local_search",
+}
+
+# Stop reasons
+STOP_MAX_GENERATIONS = "max_generations"
+STOP_TARGET = "target_fitness"
+STOP_STAGNATION = "stagnation"
+STOP_TIME_LIMIT = "time_limit"
+STOP_CANCELLED = "cancelled"
+
+class ProgressEvent(NamedTuple):
+    run_index: int
+    generation: int
+    generations: int
+    best_fitness: float
+    mean_fitness: float = 0.0
+    hard_violations: int = 0  # hard constraint violations of the best individual
+    elapsed: float = 0.0  # seconds since the solve started
+    assigned: Optional[List[int]] = None  # best assignment, only when it improved since the last event
+    finished: bool = False
+
+ProgressCallback = Callable[[ProgressEvent], None]
+
+class TqdmProgress:
+    """Progress callback drawing a tqdm bar for one run."""
+
+    def __init__(self, label: str, total: int):
+        self.bar = tqdm(total=total, desc=label, unit="gen")
+
+    def __call__(self, event: ProgressEvent) -> None:
+        self.bar.update(event.generation - self.bar.n)
+        self.bar.set_postfix(best_fitness=f"{event.best_fitness:.2f}")
+        if event.finished:
+            self.bar.close()
+
+class RunResult(NamedTuple):
+    run_index: int
+    seed: int
+    assigned: Sequence[int]
+    fitness: float
+    initial_fitness: float
+    cache_hits: int = 0
+    cache_misses: int = 0
+    generations: int = 0
+    stop_reason: Optional[str] = None
+    evaluations: int = 0
+    children: int = 0
+    repaired_children: int = 0
+    infeasible_children: int = 0
+    local_search: Optional[LocalSearchStats] = None  # set by GARun.result
+    phases: Optional[PhaseTimes] = None  # set by GARun.result
+    population_size: int = 0
+    max_generations: int = 0
+    elitism: int = 0
+    operators: Optional[OperatorControl] = None  # only with adaptive operator control
+    resumed_from: Optional[int] = None  # generation of the checkpoint the run continued from
+
+class GARun:
+    """
+    One GA run that can be advanced a slice of generations at a time.
+
+    The run ends at the configured maximum generations, or earlier when the
+    best fitness reaches target_fitness, has not improved for
+    stagnation_generations, the monotonic-clock deadline passes, or the
+    cancel event is set. With local_search enabled, the elite is hill-climbed
+    every local_search_interval generations and the final best once more,
+    each call limited to local_search_time seconds. With adaptive set, the
+    population chooses its operators online and the elite is a share of the
+    population (population size and generations are sized beforehand by
+    adaptive_config).
+
+    With a checkpoint path and solver.checkpoint (or resume), the population
+    is saved every checkpoint_interval generations and when the run stops. With
+    solver.resume and an existing checkpoint, the run continues from it
+    (individuals, fitnesses, generation and RNG state) up to the configured
+    generations, which stay the total budget; stagnation counts from the
+    resumed generation. Counters and operator statistics cover this
+    invocation only.
+
+    on_progress receives at most one ProgressEvent per progress_interval
+    seconds, plus the final one; the best assignment is attached whenever it
+    improved since the previous event. The tqdm bar shown with show_progress
+    is another listener on the same events, updated every generation.
+    """
+
+    def __init__(
+        self,
+        problem: CompiledProblem,
+        config: SolverConfig,
+        run_index: int = 0,
+        total_runs: int = 1,
+        seed: Optional[int] = None,
+        show_progress: bool = False,
+        label: str = "GA",
+        deadline: Optional[float] = None,
+        cancel=None,
+        on_progress: Optional[ProgressCallback] = None,
+        started: Optional[float] = None,
+        checkpoint: Optional[str] = None,
+    ):
+        self.problem = problem
+        self.run_index = run_index
+        self.seed = seed
+        self.generations = config.generations
+        self.generation = 0
+        self.target_fitness = config.target_fitness
+        self.stagnation_generations = config.stagnation_generations
+        self.deadline = deadline
+        self.cancel = cancel
+        self.on_progress = on_progress
+        self.progress_interval = config.progress_interval
+        self.started = started if started is not None else time.monotonic()
+        self.stop_reason: Optional[str] = None
+        self.local_search = config.local_search
+        self.local_search_interval = max(1, config.local_search_interval)
+        self.local_search_elite = config.local_search_elite
+        self.local_search_time = config.local_search_time
+        self.local_search_stats = LocalSearchStats()
+        self.checkpoint = checkpoint if config.checkpoint or config.resume else None
+        self.checkpoint_interval = max(1, config.checkpoint_interval)
+        self.parameters = config.model_dump(include=CHECKPOINT_PARAMETERS)
+        saved = self._load(checkpoint) if config.resume and checkpoint and os.path.exists(checkpoint) else None
+        self.resumed_from: Optional[int] = None
+
+        # Initialize population
+        size = config.population_size or POPULATION_SIZE
+        self.elitism = adaptive_elitism(size) if config.adaptive else min(ELITISM, size)
+        self.population = Population(
+            problem,
+            size=size,
+            engine=config.engine,
+            seed=seed,
+            cache_size=config.fitness_cache_size,
+            warm_start=config.warm_start,
+            warm_start_perturbation=config.warm_start_perturbation,
+            crossover=config.crossover,
+            repair=config.repair,
+            adaptive=config.adaptive,
+            seeding=config.seeding,
+            seeding_noise=config.seeding_noise,
+            individuals=self._restore(saved) if saved is not None else None,
+            deadline=deadline,
+        )
+
+        # Track initial best fitness
+        self.initial_fitness = self.population.get_best().fitness
+        self.best_fitness = self.initial_fitness
+        self.last_improvement = 0
+        if saved is not None:
+            self.population.rng.setstate(saved.rng_state)
+            self.seed = saved.seed
+            self.generation = self.last_improvement = self.resumed_from = saved.generation
+            self.initial_fitness = saved.initial_fitness
+            self.best_fitness = min(saved.best_fitness, self.best_fitness)
+
+        self.progress: Optional[TqdmProgress] = None
+        if show_progress:
+            run_label = f"{label} {run_index + 1}/{total_runs}" if total_runs > 1 else label
+            self.progress = TqdmProgress(run_label, self.generations)
+        self.last_reported = float('-inf')
+        self.improved_since_report = True
+
+        self._check_stop()
+
+    @property
+    def finished(self) -> bool:
+        return self.stop_reason is not None
+
+    def _check_stop(self) -> None:
+        if self.cancel is not None and self.cancel.is_set():
+            self.stop_reason = STOP_CANCELLED
+        elif self.generation >= self.generations:
+            self.stop_reason = STOP_MAX_GENERATIONS
+        elif self.target_fitness is not None and self.best_fitness <= self.target_fitness:
+            self.stop_reason = STOP_TARGET
+        elif (
+            self.stagnation_generations is not None
+            and self.generation - self.last_improvement >= self.stagnation_generations
+        ):
+            self.stop_reason = STOP_STAGNATION
+        elif self.deadline is not None and time.monotonic() >= self.deadline:
+            self.stop_reason = STOP_TIME_LIMIT
+
+    def _load(self, path: str) -> Checkpoint:
+        saved = load_checkpoint(path)
+        if saved.num_students != self.problem.num_students or any(
+            g < 0 or g >= self.problem.total_groups for genes in saved.genes for g in genes
+        ):
+            raise ValueError(f"Checkpoint {path} does not match the problem")
+        return saved
+
+    @staticmethod
+    def _restore(saved: Checkpoint) -> List[Chromosome]:
+        individuals = []
+        for genes, fitness in zip(saved.genes, saved.fitnesses):
+            individual = Chromosome(genes)
+            individual.fitness = fitness
+            individuals.append(individual)
+        return individuals
+
+    def save(self) -> None:
+        """Write the population to the run's checkpoint file."""
+        with self.population.times.timed("checkpoint"):
+            individuals = self.population.individuals
+            save_checkpoint(self.checkpoint, Checkpoint(
+                generation=self.generation,
+                seed=self.seed,
+                rng_state=self.population.rng.getstate(),
+                best_fitness=self.best_fitness,
+                initial_fitness=self.initial_fitness,
+                num_students=self.problem.num_students,
+                genes=[individual.genes for individual in individuals],
+                fitnesses=[individual.fitness for individual in individuals],
+                parameters=self.parameters,
+            ))
+
+    def step(self, generations: Optional[int] = None) -> None:
+        """Evolve for up to the given number of generations (default: until a stopping rule fires)."""
+        done = 0
+        while not self.finished and (generations is None or done < generations):
+            self.population.evolve(
+                crossover_rate=CROSSOVER_RATE,
+                mutation_rate=MUTATION_RATE,
+                elitism=self.elitism
+            )
+            self.generation += 1
+            done += 1
+            if self.local_search != "none" and self.generation % self.local_search_interval == 0:
+                for individual in self.population.top(self.local_search_elite):
+                    self._hill_climb(individual)
+            best = self.population.get_best()
+            if best.fitness < self.best_fitness:
+                self.best_fitness = best.fitness
+                self.last_improvement = self.generation
+                self.improved_since_report = True
+            self._check_stop()
+            if self.checkpoint is not None and not self.finished and self.generation % self.checkpoint_interval == 0:
+                self.save()
+            self._report()
+
+    def _hill_climb(self, individual) -> None:
+        deadline = time.monotonic() + self.local_search_time
+        if self.deadline is not None:
+            deadline = min(deadline, self.deadline)
+        with self.population.times.timed("local_search"):
+            hill_climb(
+                individual, self.problem, self.local_search, deadline, self.population.rng, self.local_search_stats,
+            )
+
+    def _report(self, finished: bool = False) -> None:
+        if self.progress is None and self.on_progress is None:
+            return
+        with self.population.times.timed("reporting"):
+            self._emit(finished)
+
+    def _hard_violations(self, individual: Chromosome) -> int:
+        # Individuals restored from a checkpoint carry their fitness only
+        if individual.hard is None:
+            individual.hard = compute_penalties(individual.genes, self.problem)[0]
+        return individual.hard
+
+    def _emit(self, finished: bool) -> None:
+        now = time.monotonic()
+        best = self.population.get_best()
+        individuals = self.population.individuals
+        event = ProgressEvent(
+            self.run_index,
+            self.generation,
+            self.generations,
+            self.best_fitness,
+            mean_fitness=sum(individual.fitness for individual in individuals) / len(individuals),
+            hard_violations=self._hard_violations(best),
+            elapsed=now - self.started,
+            finished=finished,
+        )
+        if self.progress is not None:
+            self.progress(event)
+        if self.on_progress is None or (not finished and now - self.last_reported < self.progress_interval):
+            return
+        if self.improved_since_report:
+            event = event._replace(assigned=list(best.genes))
+            self.improved_since_report = False
+        self.last_reported = now
+        self.on_progress(event)
+
+    def result(self) -> RunResult:
+        if self.local_search != "none" and self.stop_reason != STOP_CANCELLED:
+            self._hill_climb(self.population.get_best())
+            self.best_fitness = min(self.best_fitness, self.population.get_best().fitness)
+        if self.checkpoint is not None:
+            self.save()
+        self._report(finished=True)
+        best = self.population.get_best()
+        cache = self.population.cache
+        return RunResult(
+            self.run_index,
+            self.seed,
+            best.genes[:],
+            best.fitness,
+            self.initial_fitness,
+            cache_hits=cache.hits if cache is not None else 0,
+            cache_misses=cache.misses if cache is not None else 0,
+            generations=self.generation,
+            stop_reason=self.stop_reason,
+            evaluations=self.population.evaluations,
+            children=self.population.children,
+            repaired_children=self.population.repaired,
+            infeasible_children=self.population.infeasible,
+            local_search=self.local_search_stats,
+            phases=self.population.times,
+            population_size=len(self.population.individuals),
+            max_generations=self.generations,
+            elitism=self.elitism,
+            operators=self.population.control,
+            resumed_from=self.resumed_from,
+        )
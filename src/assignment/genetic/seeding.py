@@ -0,0 +1,194 @@
+import heapq
+import random
+import time
+from array import array
+from collections import deque
+from itertools import chain, islice
+from typing import Dict, List, Optional
+from .chromosome import Chromosome, _place_students
+from .compiled import CompiledProblem, SCALING_FACTOR
+from .operators import perturb
+from ..models import CriterionType
+
+EPSILON = 0.01  # bid increment in rank units; the assignment is within n * EPSILON of the best ranking sum
+MAX_BIDS_PER_STUDENT = 200  # bound on bidding when capacities cannot take every student
+MAX_CONSTRUCTED = 4  # auctions per population; further seeds are perturbed copies
+SWAP_PARTNERS = 8  # members of a group tried when moving a student away from an excluded partner
+
+def eligible_groups(problem: CompiledProblem) -> List[List[int]]:
+    """
+    Possible groups of each student whose prerequisites the student meets;
+    all possible groups when it meets none, and the fallback group for
+    students without possible groups.
+    """
+    thresholds: Dict[int, List[tuple]] = {}
+    for g, plans in enumerate(problem.group_plans):
+        for column, configs in plans:
+            for c_config in configs:
+                if c_config.kind == CriterionType.PREREQUISITE:
+                    thresholds.setdefault(g, []).append((column, c_config.target))
+
+    eligible = []
+    for s, possible in enumerate(problem.possible):
+        if not possible:
+            eligible.append([problem.fallback_group])
+            continue
+        if thresholds:
+            met = [
+                g for g in possible
+                if all(problem.values[column][s] >= target for column, target in thresholds.get(g, ()))
+            ]
+            possible = met or possible
+        eligible.append(possible)
+    return eligible
+
+def _ranking_values(problem: CompiledProblem, s: int, noise: float, rng: random.Random) -> Optional[Dict[int, float]]:
+    """Weighted ranking of each group the student ranked, optionally with uniform noise of up to `noise` ranks."""
+    rankings = problem.rankings[s]
+    if not rankings:
+        return None
+    scale = problem.weighted_ranking_scale
+    values = {}
+    for g_id, rank in rankings.items():
+        g = problem.group_index.get(g_id)
+        if g is not None:
+            values[g] = rank * scale + (rng.random() * noise * scale if noise else 0.0)
+    return values
+
+def auction_assignment(
+    problem: CompiledProblem,
+    eligible: List[List[int]],
+    rng: random.Random,
+    noise: float = 0.0,
+) -> List[int]:
+    """
+    Assignment maximizing the ranking sum subject to group sizes and the
+    eligible groups, by a forward auction for the transportation problem.
+
+    Unassigned students bid for the eligible group with the best ranking net
+    of its price, raising it by the margin over their second choice plus
+    epsilon; a full group evicts its lowest bidder and its price becomes the
+    lowest accepted bid. The result is within epsilon per student of a
+    min-cost assignment. Ties between unranked groups are broken by a random
+    scan order, and `noise` adds random rank offsets for diverse variants.
+    Students still unplaced when capacities run out (or bidding exceeds its
+    bound) are placed by remaining capacity as in random initialization.
+    """
+    n = problem.num_students
+    scale = problem.weighted_ranking_scale or SCALING_FACTOR
+    epsilon = scale * EPSILON
+    capacity = problem.group_sizes + [n] * (problem.total_groups - problem.num_groups)
+    price = [0.0 if size > 0 else float('inf') for size in capacity]
+    holders: List[list] = [[] for _ in range(problem.total_groups)]
+    values = [_ranking_values(problem, s, noise, rng) for s in range(n)]
+    offsets = [rng.randrange(len(groups)) for groups in eligible]
+    assigned = [-1] * n
+
+    queue = deque(rng.sample(range(n), n))
+    bids = 0
+    max_bids = MAX_BIDS_PER_STUDENT * n
+    leftover = []
+    while queue and bids < max_bids:
+        s = queue.popleft()
+        groups = eligible[s]
+        ranked = values[s]
+        offset = offsets[s]
+        best = -1
+        first = second = float('-inf')
+        for g in chain(islice(groups, offset, None), islice(groups, 0, offset)):
+            net = (ranked.get(g, 0.0) if ranked else 0.0) - price[g]
+            if net > first:
+                first, second, best = net, first, g
+            elif net > second:
+                second = net
+        if first == float('-inf'):
+            leftover.append(s)
+            continue
+        if second == float('-inf'):
+            second = first
+        bids += 1
+
+        bid = price[best] + first - second + epsilon
+        heap = holders[best]
+        if len(heap) < capacity[best]:
+            heapq.heappush(heap, (bid, s))
+        else:
+            _, evicted = heapq.heapreplace(heap, (bid, s))
+            assigned[evicted] = -1
+            queue.append(evicted)
+        assigned[s] = best
+        if len(heap) == capacity[best]:
+            price[best] = heap[0][0]
+
+    leftover.extend(queue)
+    if leftover:
+        remaining = [size - len(heap) for size, heap in zip(capacity, holders)]
+        _place_students(problem, assigned, leftover, remaining, rng)
+    return assigned
+
+def separate_exclusions(problem: CompiledProblem, assigned: List[int], eligible: List[List[int]], rng: random.Random) -> None:
+    """
+    Move students away from excluded partners in place, by swapping with a
+    member of another eligible group when neither gains a conflict; group
+    sizes are kept.
+    """
+    exclusions = problem.exclusions
+    members: List[List[int]] = [[] for _ in range(problem.total_groups)]
+    for s, g in enumerate(assigned):
+        members[g].append(s)
+
+    def conflicts(s: int, g: int, ignore: int = -1) -> int:
+        return sum(1 for partner in exclusions[s] if partner != ignore and assigned[partner] == g)
+
+    for s in range(problem.num_students):
+        if not exclusions[s] or not conflicts(s, assigned[s]):
+            continue
+        g = assigned[s]
+        for h in rng.sample(eligible[s], len(eligible[s])):
+            if h == g or conflicts(s, h):
+                continue
+            group = members[h]
+            partners = rng.sample(group, min(SWAP_PARTNERS, len(group)))
+            swapped = next(
+                (t for t in partners if problem.is_possible(t, g) and not conflicts(t, g, ignore=s)),
+                None,
+            )
+            if swapped is None:
+                continue
+            assigned[s], assigned[swapped] = h, g
+            members[g].remove(s)
+            members[h].remove(swapped)
+            members[g].append(swapped)
+            members[h].append(s)
+            break
+
+def constructive_seeds(
+    problem: CompiledProblem,
+    count: int,
+    rng: random.Random,
+    noise: float = 0.5,
+    perturbation: float = 0.05,
+    deadline: Optional[float] = None,
+) -> List[Chromosome]:
+    """
+    `count` strong starting solutions: a noiseless auction assignment, up to
+    MAX_CONSTRUCTED - 1 noisy ones, and perturbed copies of them for the
+    rest, each with excluded partners separated where a swap allows. Fewer
+    (at least one) are returned once the monotonic deadline passes.
+    """
+    if count <= 0:
+        return []
+    eligible = eligible_groups(problem)
+    constructed = []
+    for variant in range(min(count, MAX_CONSTRUCTED)):
+        if constructed and deadline is not None and time.monotonic() >= deadline:
+            break
+        assigned = auction_assignment(problem, eligible, rng, noise if variant else 0.0)
+        separate_exclusions(problem, assigned, eligible, rng)
+        constructed.append(Chromosome(array('i', assigned)))
+    seeds = list(constructed)
+    while len(seeds) < count:
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        seeds.append(perturb(constructed[len(seeds) % len(constructed)], problem, perturbation, rng))
+    return seeds
@@ -0,0 +1,199 @@
+from array import array
+from typing import List, Sequence, Tuple
+from .chromosome import Chromosome
+from .compiled import CompiledProblem, HARD_CONSTRAINT_PENALTY
+from ..models import CriterionType
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency (the "fast" extra)
+    np = None
+
+def numpy_available() -> bool:
+    return np is not None
+
+class VectorizedEvaluator:
+    """
+    Population-wide fitness evaluation with NumPy.
+
+    The population is scored as one (individuals x students) matrix of group
+    indices; group counts, criterion sums and maxima, prerequisite violations,
+    exclusion hits and ranking sums are computed with a handful of batched
+    array operations. Penalties match compute_penalties exactly.
+    """
+
+    def __init__(self, problem: CompiledProblem):
+        if np is None:
+            raise RuntimeError("The numpy engine requires numpy (install the 'fast' extra)")
+        self.problem = problem
+        self.num_groups = problem.num_groups
+        self.total_groups = problem.total_groups
+        self.sizes = np.asarray(problem.group_sizes, dtype=np.int64)
+
+        values = np.asarray(problem.values, dtype=np.int64).reshape(len(problem.criteria), problem.num_students)
+        self.values = values
+
+        # Flatten group plans into parallel arrays per criterion kind
+        minimize, pull, prereq = [], [], []
+        for g, plans in enumerate(problem.group_plans):
+            size = problem.group_sizes[g]
+            for column, configs in plans:
+                for c_config in configs:
+                    if c_config.kind == CriterionType.MINIMIZE:
+                        minimize.append((g, column, c_config.target, size))
+                    elif c_config.kind == CriterionType.PULL:
+                        pull.append((g, column, size))
+                    elif c_config.kind == CriterionType.PREREQUISITE:
+                        prereq.append((g, column, c_config.target))
+
+        self.minimize = self._columns(minimize, 4)
+        self.pull = self._columns(pull, 3)
+
+        # Only columns used by MINIMIZE/PULL need group sums; only PULL needs maxima
+        self.sum_columns = sorted({column for _, column, _, _ in minimize} | {column for _, column, _ in pull})
+        self.max_columns = sorted({column for _, column, _ in pull})
+        sum_slot = {column: i for i, column in enumerate(self.sum_columns)}
+        max_slot = {column: i for i, column in enumerate(self.max_columns)}
+        self.minimize_slots = np.asarray([sum_slot[column] for _, column, _, _ in minimize], dtype=np.intp)
+        self.pull_slots = np.asarray([sum_slot[column] for _, column, _ in pull], dtype=np.intp)
+        self.pull_max_slots = np.asarray([max_slot[column] for _, column, _ in pull], dtype=np.intp)
+
+        # Violating students per distinct (column, threshold)
+        prereq_keys = sorted({(column, threshold) for _, column, threshold in prereq})
+        prereq_slot = {key: i for i, key in enumerate(prereq_keys)}
+        self.prereq_violators = [
+            np.flatnonzero(values[column] < threshold) for column, threshold in prereq_keys
+        ]
+        self.prereq = (
+            np.asarray([g for g, _, _ in prereq], dtype=np.intp),
+            np.asarray([prereq_slot[(column, threshold)] for _, column, threshold in prereq], dtype=np.intp),
+        )
+
+        pairs = np.asarray(problem.exclude_pairs, dtype=np.intp).reshape(-1, 2)
+        self.exclude_a = pairs[:, 0]
+        self.exclude_b = pairs[:, 1]
+
+        self.has_rankings = problem.has_rankings
+        ranking = np.zeros((problem.num_students, self.total_groups), dtype=np.int64)
+        for s, ranking_values in enumerate(problem.ranking_values):
+            if ranking_values is not None:
+                ranking[s] = ranking_values
+        self.ranking = ranking
+        self.student_range = np.arange(problem.num_students)
+
+        self.change_penalty = problem.change_penalty
+        if self.change_penalty:
+            previous = np.asarray(problem.previous, dtype=np.intp)
+            self.previous_students = np.flatnonzero(previous >= 0)
+            self.previous_groups = previous[self.previous_students]
+        self._tile_cache = {}
+
+    @staticmethod
+    def _columns(rows: List[tuple], width: int):
+        return tuple(
+            np.asarray([row[i] for row in rows], dtype=np.int64) for i in range(width)
+        )
+
+    def _tiled(self, column: int, num_individuals: int):
+        """Value column repeated once per individual, cached per population size."""
+        key = (column, num_individuals)
+        tiled = self._tile_cache.get(key)
+        if tiled is None:
+            tiled = np.tile(self.values[column], num_individuals)
+            self._tile_cache[key] = tiled
+        return tiled
+
+    def to_matrix(self, individuals: List[Chromosome]):
+        """Stack the population into an (individuals x students) group index matrix."""
+        return self._stack([individual.genes for individual in individuals])
+
+    def _stack(self, rows: List[Sequence[int]]):
+        # Gene arrays are C ints, so the matrix is one bulk copy of their buffers
+        if all(isinstance(row, array) for row in rows):
+            buffer = b"".join(row.tobytes() for row in rows)
+            return np.frombuffer(buffer, dtype=np.intc).reshape(len(rows), self.problem.num_students)
+        return np.asarray(rows, dtype=np.intp)
+
+    def penalties(self, matrix) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Return (hard, soft) penalty vectors for an assignment matrix."""
+        num_individuals, num_students = matrix.shape
+        G = self.total_groups
+        offsets = (np.arange(num_individuals) * G)[:, None]
+        flat = (matrix + offsets).ravel()
+        bins = num_individuals * G
+
+        # 1. Group size constraints
+        counts = np.bincount(flat, minlength=bins).reshape(num_individuals, G)
+        hard = np.abs(counts[:, :self.num_groups] - self.sizes).sum(axis=1)
+        soft = np.zeros(num_individuals, dtype=np.int64)
+
+        # 2. Exclusion constraints
+        if self.exclude_a.size:
+            hard += (matrix[:, self.exclude_a] == matrix[:, self.exclude_b]).sum(axis=1)
+
+        # 3. Criteria constraints and objectives
+        sums = np.empty((len(self.sum_columns), num_individuals, G), dtype=np.int64)
+        for i, column in enumerate(self.sum_columns):
+            weights = self._tiled(column, num_individuals)
+            sums[i] = np.rint(np.bincount(flat, weights=weights, minlength=bins)).reshape(num_individuals, G)
+
+        groups, _, targets, sizes = self.minimize
+        if groups.size:
+            group_sums = sums[self.minimize_slots, :, groups]  # (plans, individuals)
+            penalty = np.abs(group_sums - targets[:, None]) * sizes[:, None]
+            occupied = counts[:, groups].T > 0
+            soft += np.where(occupied, penalty, 0).sum(axis=0)
+
+        groups, _, sizes = self.pull
+        if groups.size:
+            maxima = np.zeros((len(self.max_columns), num_individuals * G), dtype=np.int64)
+            for i, column in enumerate(self.max_columns):
+                weights = self._tiled(column, num_individuals)
+                np.maximum.at(maxima[i], flat, weights)
+            maxima = maxima.reshape(len(self.max_columns), num_individuals, G)
+            group_sums = sums[self.pull_slots, :, groups]
+            group_max = maxima[self.pull_max_slots, :, groups]
+            penalty = (group_max * sizes[:, None] - group_sums) * sizes[:, None]
+            occupied = counts[:, groups].T > 0
+            soft += np.where(occupied, penalty, 0).sum(axis=0)
+
+        groups, slots = self.prereq
+        if groups.size:
+            violations = np.zeros((len(self.prereq_violators), num_individuals, G), dtype=bool)
+            for i, violators in enumerate(self.prereq_violators):
+                if violators.size:
+                    hits = (matrix[:, violators] + offsets).ravel()
+                    violations[i] = np.bincount(hits, minlength=bins).reshape(num_individuals, G) > 0
+            hard += violations[slots, :, groups].sum(axis=0)
+
+        # 4. Rankings objective
+        if self.has_rankings:
+            ranking_sum = self.ranking[self.student_range, matrix].sum(axis=1)
+            soft += self.problem.ranking_base - ranking_sum
+
+        # 5. Changes from the previous assignment
+        if self.change_penalty:
+            changes = (matrix[:, self.previous_students] != self.previous_groups).sum(axis=1)
+            soft += changes * self.change_penalty
+
+        return hard, soft
+
+    def score(self, rows: List[Sequence[int]]) -> List[float]:
+        """Fitness of each dense assignment row, scored in one batch."""
+        return [fitness for fitness, _ in self.score_with_hard(rows)]
+
+    def score_with_hard(self, rows: List[Sequence[int]]) -> List[Tuple[float, int]]:
+        """(fitness, hard-constraint violations) of each dense assignment row, scored in one batch."""
+        if not rows:
+            return []
+        hard, soft = self.penalties(self._stack(rows))
+        return [(h * HARD_CONSTRAINT_PENALTY + s, h) for h, s in zip(hard.tolist(), soft.tolist())]
+
+    def evaluate(self, individuals: List[Chromosome]) -> None:
+        """Score all individuals in one batch, setting their fitness."""
+        if not individuals:
+            return
+        hard, soft = self.penalties(self.to_matrix(individuals))
+        for individual, h, s in zip(individuals, hard.tolist(), soft.tolist()):
+            individual.fitness = h * HARD_CONSTRAINT_PENALTY + s
+            individual.hard = h
@@ -0,0 +1,56 @@
+from typing import Dict, List, NotRequired, Optional, TypedDict
+from pydantic import ConfigDict, TypeAdapter, ValidationError, with_config
+from .models import ProblemInput, StudentColumns
+
+class StudentRecord(TypedDict):
+    """A student as validated by the fast path: a plain dict, coerced like StudentConfig."""
+    id: int
+    possible_groups: List[int]
+    values: Dict[str, float]
+    rankings: NotRequired[Optional[Dict[int, float]]]
+
+@with_config(ConfigDict(extra="allow"))
+class ProblemDocument(TypedDict):
+    """A problem whose students are validated in bulk; the other fields pass through to ProblemInput."""
+    students: List[StudentRecord]
+
+_document = TypeAdapter(ProblemDocument)
+_documents = TypeAdapter(List[ProblemDocument])
+_problems = TypeAdapter(List[ProblemInput])
+
+def _columns(students: List[StudentRecord]) -> StudentColumns:
+    return StudentColumns(
+        ids=[s["id"] for s in students],
+        possible_groups=[s["possible_groups"] for s in students],
+        values=[s["values"] for s in students],
+        rankings=[s.get("rankings") for s in students],
+    )
+
+def _from_document(document: dict) -> ProblemInput:
+    students = document.pop("students")
+    return ProblemInput.from_columns(document, _columns(students))
+
+def parse_problem(data: bytes) -> ProblemInput:
+    """
+    Parse a JSON problem without building a StudentConfig per student.
+
+    JSON decoding and student validation (including the str -> int coercion
+    of ranking keys) run in one pass in pydantic-core, producing plain dicts
+    that are split into StudentColumns; only the small remainder of the
+    problem is validated as models. Invalid input is validated again by
+    ProblemInput.model_validate_json, so the ValidationError raised is the
+    one a single model pass reports, with all its errors and locations.
+    """
+    try:
+        return _from_document(_document.validate_json(data))
+    except ValidationError:
+        ProblemInput.model_validate_json(data)
+        raise
+
+def parse_problems(data: bytes) -> List[ProblemInput]:
+    """Parse a JSON array of problems, as parse_problem."""
+    try:
+        return [_from_document(document) for document in _documents.validate_json(data)]
+    except ValidationError:
+        _problems.validate_json(data)
+        raise
@@ -0,0 +1,329 @@
+import logging
+import multiprocessing
+import threading
+import time
+import urllib.request
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from .cache import ResultCache, problem_key
+from .metrics import SolverMetrics
+from .models import (
+    AssignmentResult, BestSolutionEvent, CacheInfo, JobInfo, JobProgress, JobStatus, ProblemInput, ProblemOutput,
+    RunProgressEvent,
+)
+from .genetic.adaptive import adaptive_config
+from .genetic.runner import ProgressEvent
+from .solver import solve_assignment
+
+logger = logging.getLogger(__name__)
+
+CALLBACK_TIMEOUT = 10.0
+
+# Receives (event name, JSON data) for each job event
+Subscriber = Callable[[str, str], None]
+
+class QueueFullError(Exception):
+    """Raised when the job queue cannot take more work."""
+
+class Job:
+    def __init__(self, problem: ProblemInput, callback_url: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.problem = problem
+        self.student_ids = problem.student_columns().ids
+        self.cache_key: Optional[str] = None
+        self.callback_url = callback_url
+        self.status = JobStatus.QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        runs_total = problem.solver.islands if problem.solver.islands > 1 else max(1, problem.solver.runs)
+        solver = problem.solver
+        if solver.adaptive:
+            solver = adaptive_config(solver, problem.num_students, len(problem.groups))
+        self.progress = JobProgress(runs_total=runs_total, generations=solver.generations)
+        self.result: Optional[ProblemOutput] = None
+        self.error: Optional[str] = None
+        # A multiprocessing Event so runs in worker processes see the cancellation too
+        self.cancel = multiprocessing.Event()
+        self.accepted = False
+        self.future: Optional[Future] = None
+        self.lock = threading.Lock()
+        self.subscribers: List[Subscriber] = []
+        # Latest events, replayed to late subscribers
+        self.last_progress: Optional[str] = None
+        self.last_best: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+    def info(self) -> JobInfo:
+        return JobInfo(
+            id=self.id,
+            status=self.status,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            progress=self.progress.model_copy(),
+            result=self.result,
+            error=self.error,
+            accepted=self.accepted,
+        )
+
+    def subscribe(self, subscriber: Subscriber) -> Callable[[], None]:
+        """
+        Stream the job's events to `subscriber`, starting with the latest
+        progress and best solution. A finished job only replays its final
+        "done" event. Returns a function that unsubscribes.
+        """
+        with self.lock:
+            if self.last_best is not None:
+                subscriber("best", self.last_best)
+            if self.last_progress is not None:
+                subscriber("progress", self.last_progress)
+            if self.finished:
+                subscriber("done", self.info().model_dump_json())
+            else:
+                self.subscribers.append(subscriber)
+
+        def unsubscribe():
+            with self.lock:
+                if subscriber in self.subscribers:
+                    self.subscribers.remove(subscriber)
+        return unsubscribe
+
+    def publish(self, name: str, data: str):
+        with self.lock:
+            if name == "progress":
+                self.last_progress = data
+            elif name == "best":
+                self.last_best = data
+            for subscriber in self.subscribers:
+                try:
+                    subscriber(name, data)
+                except Exception:
+                    logger.exception("Event subscriber of job %s failed", self.id)
+
+class JobManager:
+    """
+    Runs solves on a bounded thread pool with a bounded queue.
+
+    Submissions beyond `workers` running plus `max_queue` waiting jobs are
+    rejected with QueueFullError. Finished jobs are kept for `retention`
+    seconds (and at most `max_finished` of them) so clients can poll results.
+
+    With a ResultCache, a problem solved before completes at submission
+    without using the pool, and every completed solve is stored. With
+    SolverMetrics, every solve that ran records its latency, queue wait and
+    profile.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_queue: int = 16,
+        retention: float = 3600.0,
+        max_finished: int = 1000,
+        cache: Optional[ResultCache] = None,
+        metrics: Optional[SolverMetrics] = None,
+        checkpoint_dir: Optional[str] = None,
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retention = retention
+        self.max_finished = max_finished
+        self.jobs: Dict[str, Job] = {}
+        self.lock = threading.Lock()
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.cache = cache
+        self.metrics = metrics
+        self.checkpoint_dir = checkpoint_dir
+
+    def configure(self, workers: Optional[int] = None, max_queue: Optional[int] = None):
+        """Resize the pool; only effective before the first job is submitted."""
+        if workers is not None:
+            self.workers = max(1, workers)
+        if max_queue is not None:
+            self.max_queue = max(0, max_queue)
+
+    def _pending(self) -> int:
+        """Jobs queued or running; the caller holds self.lock."""
+        return sum(1 for job in self.jobs.values() if not job.finished)
+
+    @property
+    def pending(self) -> int:
+        """Jobs queued or running."""
+        with self.lock:
+            return self._pending()
+
+    @property
+    def queued(self) -> int:
+        with self.lock:
+            return sum(1 for job in self.jobs.values() if job.status == JobStatus.QUEUED)
+
+    @property
+    def running(self) -> int:
+        with self.lock:
+            return sum(1 for job in self.jobs.values() if job.status == JobStatus.RUNNING)
+
+    def submit(self, problem: ProblemInput, callback_url: Optional[str] = None, use_cache: bool = True) -> Job:
+        """
+        Queue a solve; use_cache=False skips the cache lookup but still stores
+        the result. Resumed solves never answer from the cache.
+        """
+        job = Job(problem, callback_url)
+        if self.cache is not None:
+            job.cache_key = problem_key(problem)
+            cached = self.cache.get(job.cache_key) if use_cache and not problem.solver.resume else None
+            if cached is not None:
+                job.result = cached
+                job.started_at = job.created_at
+                job.progress.runs_completed = job.progress.runs_total
+                job.future = Future()
+                job.future.set_result(None)
+                with self.lock:
+                    self._prune()
+                    self.jobs[job.id] = job
+                self._finish(job, JobStatus.COMPLETED)
+                return job
+
+        with self.lock:
+            self._prune()
+            pending = self._pending()
+            if pending >= self.workers + self.max_queue:
+                raise QueueFullError(f"Job queue is full ({pending} jobs pending)")
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ga-job")
+            self.jobs[job.id] = job
+            job.future = self.executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued job, or ask a running one to stop at the next generation."""
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+        job.cancel.set()
+        if job.future is not None and job.future.cancel():
+            self._finish(job, JobStatus.CANCELLED)
+        return job
+
+    def accept(self, job_id: str) -> Optional[Job]:
+        """Stop a running job at the next generation and complete it with the best solution so far."""
+        job = self.get(job_id)
+        if job is None or job.status != JobStatus.RUNNING:
+            return job
+        job.accepted = True
+        job.cancel.set()
+        return job
+
+    def discard(self, job_id: str):
+        with self.lock:
+            self.jobs.pop(job_id, None)
+
+    def _prune(self):
+        now = time.time()
+        finished = sorted(
+            (job for job in self.jobs.values() if job.finished),
+            key=lambda job: job.finished_at,
+        )
+        excess = len(finished) - self.max_finished
+        for i, job in enumerate(finished):
+            if i < excess or now - job.finished_at > self.retention:
+                del self.jobs[job.id]
+
+    def _run(self, job: Job):
+        if job.cancel.is_set():
+            self._finish(job, JobStatus.CANCELLED)
+            return
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = solve_assignment(
+                job.problem,
+                cancel=job.cancel,
+                on_progress=lambda event: self._on_progress(job, event),
+                on_profile=self.metrics.observe_profile if self.metrics is not None else None,
+                checkpoint_dir=self.checkpoint_dir,
+            )
+        except Exception as e:
+            logger.exception("Job %s failed", job.id)
+            job.error = str(e)
+            self._finish(job, JobStatus.FAILED)
+            self._observe(job)
+            return
+        cancelled = job.cancel.is_set() and not job.accepted
+        # Only complete searches are worth serving again
+        if job.cache_key is not None and not job.cancel.is_set():
+            job.result.cache = CacheInfo(key=job.cache_key, hit=False)
+            self.cache.put(job.cache_key, job.result)
+        self._finish(job, JobStatus.CANCELLED if cancelled else JobStatus.COMPLETED)
+        self._observe(job)
+
+    def _observe(self, job: Job):
+        if self.metrics is not None:
+            self.metrics.observe_solve(
+                job.status.value, job.finished_at - job.started_at, job.started_at - job.created_at,
+            )
+
+    def _on_progress(self, job: Job, event: ProgressEvent):
+        progress = job.progress
+        progress.generation = event.generation
+        progress.generations = event.generations
+        progress.elapsed = event.elapsed
+        if progress.best_fitness is None or event.best_fitness < progress.best_fitness:
+            progress.best_fitness = event.best_fitness
+            progress.hard_violations = event.hard_violations
+        if event.finished:
+            progress.runs_completed += 1
+
+        job.publish("progress", RunProgressEvent(
+            run=event.run_index + 1,
+            generation=event.generation,
+            generations=event.generations,
+            best_fitness=event.best_fitness,
+            mean_fitness=event.mean_fitness,
+            hard_violations=event.hard_violations,
+            elapsed=event.elapsed,
+            finished=event.finished,
+        ).model_dump_json())
+        # Only improvements of the overall best are streamed
+        if event.assigned is not None and event.best_fitness <= progress.best_fitness:
+            assignments = [
+                AssignmentResult(student_id=s_id, group_id=group_id)
+                for s_id, group_id in zip(job.student_ids, event.assigned)
+            ]
+            assignments.sort(key=lambda a: a.student_id)
+            job.publish("best", BestSolutionEvent(
+                run=event.run_index + 1,
+                generation=event.generation,
+                fitness=event.best_fitness,
+                hard_violations=event.hard_violations,
+                assignments=assignments,
+            ).model_dump_json())
+
+    def _finish(self, job: Job, status: JobStatus):
+        job.status = status
+        job.finished_at = time.time()
+        job.publish("done", job.info().model_dump_json())
+        if job.callback_url:
+            threading.Thread(target=self._notify, args=(job,), daemon=True).start()
+
+    def _notify(self, job: Job):
+        """POST the final job info to the job's callback URL; failures are only logged."""
+        request = urllib.request.Request(
+            job.callback_url,
+            data=job.info().model_dump_json().encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=CALLBACK_TIMEOUT):
+                pass
+        except Exception:
+            logger.exception("Callback for job %s to %s failed", job.id, job.callback_url)
@@ -1,62 +1,391 @@
 import sys
 import os
-import json
 import argparse
 import asyncio
+import time
+from typing import Any, Dict, Optional
 import uvicorn
-from fastapi import FastAPI
-from .models import ProblemInput, ProblemOutput
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from .batch import BatchItem, BatchSolver, read_files, read_jsonl, write_jsonl
+from .cache import ResultCache, problem_key
+from .ingest import parse_problem, parse_problems
+from .jobs import Job, JobManager, QueueFullError
+from .metrics import SolverMetrics
+from .models import CacheInfo, JobInfo, JobStatus, PhaseStats, ProblemInput, ProblemOutput, SolverConfig
 from .solver import solve_assignment
+from .genetic.islands import TOPOLOGIES, TRANSPORTS
+from .genetic.local_search import STRATEGIES
+from .genetic.operators import CROSSOVERS
+from .genetic.population import ENGINES
 
 app = FastAPI(title="GA Assignment Solver API")
 
-@app.post("/solve", response_model=ProblemOutput)
-async def solve_endpoint(input_data: ProblemInput):
+# Seconds between SSE keep-alive comments on an idle stream
+SSE_KEEPALIVE = 15.0
+
+CACHE_SIZE = int(os.environ.get("GA_CACHE_SIZE", 256))
+CACHE_TTL = float(os.environ["GA_CACHE_TTL"]) if os.environ.get("GA_CACHE_TTL") else None
+CACHE_DB = os.environ.get("GA_CACHE_DB") or None
+CHECKPOINT_DIR = os.environ.get("GA_CHECKPOINT_DIR") or None
+
+def _result_cache(size: int, ttl: Optional[float], path: Optional[str]) -> Optional[ResultCache]:
+    """Result cache for the given settings, or None when neither memory nor a database is used."""
+    if size <= 0 and not path:
+        return None
+    return ResultCache(maxsize=max(0, size), ttl=ttl, path=path)
+
+metrics = SolverMetrics()
+
+job_manager = JobManager(
+    workers=int(os.environ.get("GA_JOB_WORKERS", os.cpu_count() or 1)),
+    max_queue=int(os.environ.get("GA_JOB_QUEUE", 16)),
+    cache=_result_cache(CACHE_SIZE, CACHE_TTL, CACHE_DB),
+    metrics=metrics,
+    checkpoint_dir=CHECKPOINT_DIR,
+)
+
+# Process pool shared by all batch requests (0 = one process per CPU)
+batch_solver = BatchSolver(
+    workers=int(os.environ.get("GA_BATCH_WORKERS", 0)), cache=job_manager.cache, checkpoint_dir=CHECKPOINT_DIR,
+)
+
+@app.middleware("http")
+async def _mark_received(request: Request, call_next):
+    # Handlers subtract this to time reading and validating the request body
+    request.state.received = time.perf_counter()
+    return await call_next(request)
+
+def _observe_parse(endpoint: str, request: Request):
+    metrics.observe_request(endpoint, "parse", time.perf_counter() - request.state.received)
+
+async def _read_body(endpoint: str, request: Request, parse):
+    """
+    Parse the request body with the fast ingest path (off the event loop),
+    answering 422 with the validation errors like a declared body would.
+    """
+    body = await request.body()
+    try:
+        parsed = await run_in_threadpool(parse, body)
+    except ValidationError as e:
+        # Located under "body" like the errors of a declared body parameter
+        raise RequestValidationError([
+            {**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)
+        ])
+    _observe_parse(endpoint, request)
+    return parsed
+
+# Request body schemas of the endpoints parsing their body by hand, added to the OpenAPI components
+_body_schemas: Dict[str, Dict[str, Any]] = {}
+
+def _json_body(model: type, array: bool = False) -> Dict[str, Any]:
+    """openapi_extra declaring a JSON body of `model` (or an array of them) for an endpoint using _read_body."""
+    schema = model.model_json_schema(ref_template="#/components/schemas/{model}")
+    _body_schemas.update(schema.pop("$defs", {}))
+    _body_schemas[model.__name__] = schema
+    ref = {"$ref": f"#/components/schemas/{model.__name__}"}
+    return {"requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": {"type": "array", "items": ref} if array else ref}},
+    }}
+
+def _openapi() -> Dict[str, Any]:
+    if app.openapi_schema is None:
+        schemas = FastAPI.openapi(app).setdefault("components", {}).setdefault("schemas", {})
+        for name, schema in _body_schemas.items():
+            schemas.setdefault(name, schema)
+    return app.openapi_schema
+
+app.openapi = _openapi
+
+def _json_response(endpoint: str, model: BaseModel, status_code: int = 200) -> Response:
+    """Serialize a response model, timing it for /metrics."""
+    start = time.perf_counter()
+    content = model.model_dump_json()
+    metrics.observe_request(endpoint, "serialize", time.perf_counter() - start)
+    return Response(content, status_code=status_code, media_type="application/json")
+
+def _submit(input_data: ProblemInput, callback_url: Optional[str] = None, no_cache: bool = False) -> Job:
+    try:
+        return job_manager.submit(input_data, callback_url, use_cache=not no_cache)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+
+def _get_job(job_id: str) -> Job:
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@app.post("/solve", response_model=ProblemOutput, openapi_extra=_json_body(ProblemInput))
+async def solve_endpoint(request: Request, no_cache: bool = False):
+    """
+    Accepts student assignment problem input (a ProblemInput body) and returns the solution.
+    The solve is cancelled if the client disconnects before it finishes.
+    Identical problems are answered from the result cache unless no_cache is set.
+    """
+    input_data = await _read_body("solve", request, parse_problem)
+    job = _submit(input_data, no_cache=no_cache)
+    waiter = asyncio.wrap_future(job.future)
+    try:
+        while not waiter.done():
+            await asyncio.wait({waiter}, timeout=0.5)
+            if not waiter.done() and await request.is_disconnected():
+                job_manager.cancel(job.id)
+                raise HTTPException(status_code=499, detail="Client disconnected")
+        if job.status == JobStatus.FAILED:
+            raise HTTPException(status_code=500, detail=job.error)
+        return _json_response("solve", job.result)
+    finally:
+        job_manager.discard(job.id)
+
+@app.post("/solve/batch", openapi_extra=_json_body(ProblemInput, array=True))
+async def solve_batch_endpoint(request: Request, no_cache: bool = False):
     """
-    Accepts student assignment problem input and returns the solution.
+    Solves a list of problems (a JSON array of ProblemInput) on the shared
+    batch worker pool, smallest first, and streams one JSON line
+    (BatchResult) per problem as it finishes; `index` is the problem's
+    position in the request.
     """
-    result = await asyncio.to_thread(solve_assignment, input_data)
-    return result
+    problems = await _read_body("batch", request, parse_problems)
+    items = [BatchItem(index, None, problem) for index, problem in enumerate(problems)]
+    lines = (result.model_dump_json() + "\n" for result in batch_solver.solve(items, use_cache=not no_cache))
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+@app.post("/jobs", response_model=JobInfo, status_code=202, openapi_extra=_json_body(ProblemInput))
+async def create_job(request: Request, callback_url: Optional[str] = None, no_cache: bool = False):
+    """
+    Queues a solve of a ProblemInput body and returns its job id immediately.
+    When callback_url is given, the final job info is POSTed there once the
+    job finishes. A cached result completes the job at once unless no_cache
+    is set.
+    """
+    input_data = await _read_body("jobs", request, parse_problem)
+    return _json_response("jobs", _submit(input_data, callback_url, no_cache).info(), status_code=202)
+
+@app.get("/jobs/{job_id}", response_model=JobInfo)
+def get_job(job_id: str):
+    """Job status, progress and, once finished, the result."""
+    return _json_response("job", _get_job(job_id).info())
+
+@app.delete("/jobs/{job_id}", response_model=JobInfo)
+def cancel_job(job_id: str):
+    """
+    Cancels a job. Queued jobs never start; running jobs stop at the next
+    generation and keep the best solution found so far as their result.
+    """
+    _get_job(job_id)
+    return job_manager.cancel(job_id).info()
+
+@app.post("/jobs/{job_id}/accept", response_model=JobInfo)
+def accept_job(job_id: str):
+    """
+    Stops a running job early and completes it with the best solution found
+    so far, e.g. one the operator saw in the event stream.
+    """
+    job = _get_job(job_id)
+    if job.status != JobStatus.RUNNING and not job.accepted:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job.status.value}, not running")
+    return job_manager.accept(job_id).info()
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    """
+    Server-sent events for a job: `progress` for run generations (throttled
+    per run by solver.progress_interval), `best` with the full assignment
+    whenever the best solution improves, and a final `done` with the job info.
+    """
+    job = _get_job(job_id)
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    unsubscribe = job.subscribe(lambda name, data: loop.call_soon_threadsafe(queue.put_nowait, (name, data)))
+
+    async def stream():
+        try:
+            while True:
+                try:
+                    name, data = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {name}\ndata: {data}\n\n"
+                if name == "done":
+                    return
+        finally:
+            unsubscribe()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """Solver metrics in the Prometheus text format."""
+    samples = {
+        "ga_jobs_queued": ("gauge", job_manager.queued, "Jobs waiting for a worker."),
+        "ga_jobs_running": ("gauge", job_manager.running, "Jobs being solved."),
+        "ga_job_workers": ("gauge", job_manager.workers, "Concurrent solves allowed."),
+        "ga_job_queue_capacity": ("gauge", job_manager.max_queue, "Jobs allowed to wait before requests are rejected."),
+    }
+    cache = job_manager.cache
+    if cache is not None:
+        samples["ga_cache_hits_total"] = ("counter", cache.hits, "Result cache hits.")
+        samples["ga_cache_misses_total"] = ("counter", cache.misses, "Result cache misses.")
+        samples["ga_cache_entries"] = ("gauge", len(cache), "Results held in memory.")
+    return PlainTextResponse(metrics.render(samples), media_type="text/plain; version=0.0.4")
+
+def _solver_config(args, problem_input: ProblemInput) -> SolverConfig:
+    """Solver settings from the input file, overridden by any CLI flags given."""
+    overrides = {
+        name: getattr(args, name)
+        for name in (
+            'runs', 'workers', 'seed', 'engine',
+            'islands', 'migration_interval', 'migration_size', 'topology', 'transport',
+            'fitness_cache_size',
+            'generations', 'stagnation_generations', 'target_fitness', 'time_limit',
+            'seeding', 'seeding_noise', 'crossover', 'repair',
+            'local_search', 'local_search_interval', 'local_search_elite', 'local_search_time',
+            'population_size', 'adaptive', 'decompose', 'profile', 'assignment_format',
+            'checkpoint_interval', 'resume',
+        )
+        if getattr(args, name) is not None
+    }
+    if args.checkpoint_dir is not None:
+        overrides['checkpoint'] = True
+    return problem_input.solver.model_copy(update=overrides)
+
+def _solve_batch(args):
+    """CLI batch mode: one JSONL result line per input problem, in completion order."""
+    if args.input_file in ([], ['-']):
+        items = read_jsonl(sys.stdin)
+    else:
+        items = read_files(args.input_file)
+    solver = BatchSolver(
+        workers=args.batch_workers,
+        cache=_result_cache(0, args.cache_ttl, args.cache_db),
+        checkpoint_dir=args.checkpoint_dir or CHECKPOINT_DIR,
+    )
+    try:
+        results = solver.solve(items, config=lambda problem: _solver_config(args, problem), use_cache=not args.no_cache)
+        if args.output:
+            with open(args.output, 'w') as f:
+                write_jsonl(results, f)
+        else:
+            write_jsonl(results, sys.stdout)
+    finally:
+        solver.shutdown()
 
 def main():
     parser = argparse.ArgumentParser(description='Assign students to groups using a Genetic Algorithm.')
-    parser.add_argument('input_file', nargs='?', help='Path to the input JSON file (or - for stdin)')
+    parser.add_argument('input_file', nargs='*', help='Path to the input JSON file (or - for stdin); several with --batch')
     parser.add_argument('--output', help='Path to the output JSON file', default=None)
     parser.add_argument('--local', action='store_true', help='Show tqdm progress and print grouped output')
-    parser.add_argument('--runs', type=int, default=5, help='Number of GA runs to pick the best result')
+    parser.add_argument('--runs', type=int, help='Number of GA runs to pick the best result (default 5)')
+    parser.add_argument('--workers', type=int, help='Processes for independent runs (0 = one per CPU, default 1)')
+    parser.add_argument('--seed', type=int, help='Base random seed for reproducible runs')
+    parser.add_argument('--engine', choices=ENGINES, help='Fitness engine (numpy evaluates the whole population at once)')
+    parser.add_argument('--islands', type=int, help='Evolve this many islands in parallel processes with migration')
+    parser.add_argument('--migration-interval', type=int, help='Generations between island migrations (default 10)')
+    parser.add_argument('--migration-size', type=int, help='Individuals each island sends per migration (default 2)')
+    parser.add_argument('--topology', choices=TOPOLOGIES, help='Island migration topology (default ring)')
+    parser.add_argument('--transport', choices=TRANSPORTS, help='Island migration transport (default pipe)')
+    parser.add_argument('--fitness-cache-size', type=int, help='Fitness cache entries per population (0 disables, default 4096)')
+    parser.add_argument('--population-size', type=int, help='Individuals per population (default 120, or sized from the problem with --adaptive)')
+    parser.add_argument('--adaptive', action='store_true', default=None, help='Size population and generations from the problem and adapt operators to their success')
+    parser.add_argument('--no-decompose', dest='decompose', action='store_false', default=None, help='Solve independent parts of the problem as one problem')
+    parser.add_argument('--generations', type=int, help='Maximum generations per run (default 200)')
+    parser.add_argument('--stagnation', dest='stagnation_generations', type=int, help='Stop a run after this many generations without improvement')
+    parser.add_argument('--target-fitness', type=float, help='Stop a run once its best fitness is at or below this value')
+    parser.add_argument('--time-limit', type=float, help='Wall-clock budget for the whole solve in seconds')
+    parser.add_argument('--seeding', type=float, help='Fraction of each initial population seeded with ranking-optimal assignments (default 0)')
+    parser.add_argument('--seeding-noise', type=float, help='Rank noise of randomized seed variants (default 0.5)')
+    parser.add_argument('--crossover', choices=CROSSOVERS, help='Crossover operator (group keeps group sizes, default uniform)')
+    parser.add_argument('--repair', action='store_true', default=None, help='Restore exact group sizes in every child')
+    parser.add_argument('--local-search', choices=STRATEGIES, help='Hill-climb the elite and the final best (first or steepest improvement)')
+    parser.add_argument('--local-search-interval', type=int, help='Generations between local-search passes (default 10)')
+    parser.add_argument('--local-search-elite', type=int, help='Fittest individuals improved per pass (default 1)')
+    parser.add_argument('--local-search-time', type=float, help='Seconds per local-search call (default 0.5)')
+    parser.add_argument('--profile', action='store_true', default=None, help='Report per-phase timings in stats.profile')
+    parser.add_argument('--assignment-format', choices=("list", "map", "columns"), help='Output assignments as a list (default), a student-to-group map or parallel columns')
+    parser.add_argument('--checkpoint', dest='checkpoint_dir', metavar='DIR', help='Save each run\'s population in DIR every checkpoint interval (GA_CHECKPOINT_DIR sets the directory for --resume and the server)')
+    parser.add_argument('--checkpoint-interval', type=int, help='Generations between checkpoints (default 10)')
+    parser.add_argument('--resume', action='store_true', default=None, help='Continue each run from its checkpoint in the checkpoint directory')
+    parser.add_argument('--no-cache', action='store_true', help='Solve even if the result cache has this problem')
+    parser.add_argument('--cache-db', default=CACHE_DB, help='SQLite file persisting solve results (default GA_CACHE_DB)')
+    parser.add_argument('--cache-ttl', type=float, default=CACHE_TTL, help='Seconds a cached result stays valid (default GA_CACHE_TTL, no expiry)')
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE, help='Results kept in memory by the server (0 disables, default 256)')
+    parser.add_argument('--batch', action='store_true', help='Solve every input file (or JSONL lines from stdin with -) and write JSONL results')
+    parser.add_argument('--batch-workers', type=int, default=0, help='Processes solving batch problems (0 = one per CPU, default)')
     parser.add_argument('--serve', action='store_true', help='Start the REST API server')
     parser.add_argument('--port', type=int, help='Port for the server')
     parser.add_argument('--host', default="0.0.0.0", help='Host for the server')
+    parser.add_argument('--job-workers', type=int, help='Concurrent solves on the server (default: CPU count)')
+    parser.add_argument('--job-queue', type=int, help='Solves allowed to wait before requests get 429 (default 16)')
     
     args = parser.parse_args()
     
     if args.serve:
         port = args.port if args.port is not None else int(os.environ.get("PORT", 8000))
+        job_manager.configure(workers=args.job_workers, max_queue=args.job_queue)
+        job_manager.cache = _result_cache(args.cache_size, args.cache_ttl, args.cache_db)
+        batch_solver.cache = job_manager.cache
+        job_manager.checkpoint_dir = batch_solver.checkpoint_dir = args.checkpoint_dir or CHECKPOINT_DIR
         print(f"Starting server on {args.host}:{port}")
         uvicorn.run(app, host=args.host, port=port)
         return
 
-    if not args.input_file:
+    if args.batch:
+        _solve_batch(args)
+        return
+
+    if len(args.input_file) != 1:
         parser.print_help()
         sys.exit(1)
+    input_file = args.input_file[0]
     
     try:
-        if args.input_file == '-':
-            input_data = json.load(sys.stdin)
+        parse_start = time.perf_counter()
+        if input_file == '-':
+            problem_input = parse_problem(sys.stdin.buffer.read())
         else:
-            with open(args.input_file, 'r') as f:
-                input_data = json.load(f)
-                
-        problem_input = ProblemInput(**input_data)
-        result = solve_assignment(problem_input, show_progress=args.local, runs=args.runs)
+            with open(input_file, 'rb') as f:
+                problem_input = parse_problem(f.read())
+        parse_seconds = time.perf_counter() - parse_start
+        config = _solver_config(args, problem_input)
+
+        # Only a database makes caching useful across CLI invocations
+        cache = _result_cache(0, args.cache_ttl, args.cache_db)
+        key = problem_key(problem_input, config) if cache is not None else None
+        result = cache.get(key) if cache is not None and not args.no_cache and not config.resume else None
+        if result is None:
+            result = solve_assignment(
+                problem_input, show_progress=args.local, config=config, checkpoint_dir=args.checkpoint_dir or CHECKPOINT_DIR,
+            )
+            if result.stats.profile is not None:
+                result.stats.profile.phases["parse"] = PhaseStats(seconds=parse_seconds, calls=1)
+            if cache is not None:
+                result.cache = CacheInfo(key=key, hit=False)
+                cache.put(key, result)
+        elif args.local:
+            print(f"Cached result {key} ({result.cache.age:.0f}s old)", file=sys.stderr)
         
         if args.local:
             grouped = {}
-            for assignment in result.assignments:
-                grouped.setdefault(assignment.group_id, []).append(assignment.student_id)
+            for student_id, group_id in result.assigned_groups().items():
+                grouped.setdefault(group_id, []).append(student_id)
             for group_id in sorted(grouped.keys()):
                 students = ", ".join(str(s_id) for s_id in sorted(grouped[group_id]))
                 print(f"{group_id}: {students}")
+            if result.stats.profile is not None:
+                for phase, timing in sorted(result.stats.profile.phases.items(), key=lambda item: -item[1].seconds):
+                    print(f"{phase:>16}: {timing.seconds:8.3f}s", file=sys.stderr)
         else:
             output_json = result.model_dump_json(indent=2)
             if args.output:
@@ -0,0 +1,119 @@
+import bisect
+import threading
+from typing import Dict, List, Sequence, Tuple
+from .models import ProfileStats
+
+# Histogram bucket upper bounds in seconds
+SOLVE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+REQUEST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# (type, value, help text) of a metric sampled when metrics are rendered
+Sample = Tuple[str, float, str]
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def lines(self, name: str, labels: str) -> List[str]:
+        lines = []
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            le = "+Inf" if bound == float('inf') else repr(bound)
+            lines.append(f'{name}_bucket{{{labels}{"," if labels else ""}le="{le}"}} {total}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {total}")
+        return lines
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{key}="{value}"' for key, value in labels.items())
+
+class SolverMetrics:
+    """
+    Process-wide solver metrics, rendered in the Prometheus text format.
+
+    Solve and queue-wait latencies are histograms by final job status;
+    request parsing and response serialization are histograms by endpoint.
+    Counters accumulate the ProfileStats of every solve: evaluations,
+    generations, search seconds and seconds per GA phase, so
+    rate(ga_evaluations_total) / rate(ga_search_seconds_total) is the
+    evaluation throughput.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.solve_seconds: Dict[str, Histogram] = {}
+        self.wait_seconds: Dict[str, Histogram] = {}
+        self.request_seconds: Dict[Tuple[str, str], Histogram] = {}
+        self.solves: Dict[str, int] = {}
+        self.evaluations = 0
+        self.generations = 0
+        self.search_seconds = 0.0
+        self.last_evaluations_per_second = 0.0
+        self.phase_seconds: Dict[str, float] = {}
+
+    def observe_solve(self, status: str, seconds: float, waited: float) -> None:
+        """A finished solve that ran for `seconds` after waiting `waited` seconds in the queue."""
+        with self.lock:
+            self.solves[status] = self.solves.get(status, 0) + 1
+            self.solve_seconds.setdefault(status, Histogram(SOLVE_BUCKETS)).observe(seconds)
+            self.wait_seconds.setdefault(status, Histogram(SOLVE_BUCKETS)).observe(waited)
+
+    def observe_profile(self, profile: ProfileStats) -> None:
+        with self.lock:
+            self.evaluations += profile.evaluations
+            self.generations += profile.generations
+            self.search_seconds += profile.search_seconds
+            self.last_evaluations_per_second = profile.evaluations_per_second
+            for phase, stats in profile.phases.items():
+                self.phase_seconds[phase] = self.phase_seconds.get(phase, 0.0) + stats.seconds
+
+    def observe_request(self, endpoint: str, phase: str, seconds: float) -> None:
+        """Request `phase` ("parse" or "serialize") of an endpoint."""
+        with self.lock:
+            self.request_seconds.setdefault((endpoint, phase), Histogram(REQUEST_BUCKETS)).observe(seconds)
+
+    def render(self, samples: Dict[str, Sample]) -> str:
+        """Text exposition of all metrics plus the given samples, keyed by metric name."""
+        out: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str):
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+
+        with self.lock:
+            metric("ga_solve_duration_seconds", "histogram", "Seconds from the start of a solve to its end, by job status.")
+            for status, histogram in sorted(self.solve_seconds.items()):
+                out.extend(histogram.lines("ga_solve_duration_seconds", _labels(status=status)))
+            metric("ga_queue_wait_seconds", "histogram", "Seconds a solve waited in the job queue, by job status.")
+            for status, histogram in sorted(self.wait_seconds.items()):
+                out.extend(histogram.lines("ga_queue_wait_seconds", _labels(status=status)))
+            metric("ga_request_seconds", "histogram", "Seconds spent parsing requests and serializing responses.")
+            for (endpoint, phase), histogram in sorted(self.request_seconds.items()):
+                out.extend(histogram.lines("ga_request_seconds", _labels(endpoint=endpoint, phase=phase)))
+
+            metric("ga_solves_total", "counter", "Finished solves by job status.")
+            for status, count in sorted(self.solves.items()):
+                out.append(f'ga_solves_total{{{_labels(status=status)}}} {count}')
+            metric("ga_evaluations_total", "counter", "Fitness evaluations of all solves.")
+            out.append(f"ga_evaluations_total {self.evaluations}")
+            metric("ga_generations_total", "counter", "Generations of all runs.")
+            out.append(f"ga_generations_total {self.generations}")
+            metric("ga_search_seconds_total", "counter", "Wall-clock seconds spent in GA runs.")
+            out.append(f"ga_search_seconds_total {self.search_seconds}")
+            metric("ga_phase_seconds_total", "counter", "Seconds per solver phase, summed over runs and processes.")
+            for phase, seconds in sorted(self.phase_seconds.items()):
+                out.append(f'ga_phase_seconds_total{{{_labels(phase=phase)}}} {seconds}')
+            metric("ga_evaluations_per_second", "gauge", "Evaluation throughput of the most recent solve.")
+            out.append(f"ga_evaluations_per_second {self.last_evaluations_per_second}")
+
+        for name, (kind, value, help_text) in samples.items():
+            metric(name, kind, help_text)
+            out.append(f"{name} {value}")
+        return "\n".join(out) + "\n"
@@ -1,6 +1,6 @@
 from enum import Enum
-from typing import Dict, List, Optional, Union
-from pydantic import BaseModel, field_validator
+from typing import Dict, List, Literal, NamedTuple, Optional, Union
+from pydantic import BaseModel, Field, PrivateAttr, SerializationInfo, field_validator, model_serializer
 
 class CriterionType(str, Enum):
     MINIMIZE = "minimize"
@@ -31,6 +31,60 @@ class StudentConfig(BaseModel):
     values: Dict[str, float]
     rankings: Optional[Dict[int, float]] = None
 
+class StudentColumns(NamedTuple):
+    """Students as parallel lists, in input order (the fast ingest form)."""
+    ids: List[int]
+    possible_groups: List[List[int]]
+    values: List[Dict[str, float]]
+    rankings: List[Optional[Dict[int, float]]]
+
+class SolverConfig(BaseModel):
+    runs: int = 5
+    workers: int = 1  # processes used for independent runs; 0 means one per CPU
+    engine: Literal["auto", "python", "numpy"] = "auto"
+    seed: Optional[int] = None
+    islands: int = 0  # > 1 evolves that many populations with migration instead of independent runs
+    migration_interval: int = 10
+    migration_size: int = 2
+    topology: Literal["ring", "all"] = "ring"
+    transport: Literal["pipe", "socket"] = "pipe"
+    fitness_cache_size: int = 4096  # LRU entries per population; 0 disables
+    population_size: Optional[int] = None  # individuals per population; default 120, or sized from the problem when adaptive
+    # Size population and generations from the problem (unless set) and choose operators by their recent success
+    adaptive: bool = False
+    # Solve independent parts (no shared possible groups or exclusions) separately and merge them
+    decompose: bool = True
+    # Stopping rules; a run stops at whichever fires first
+    generations: int = 200
+    stagnation_generations: Optional[int] = None  # stop after this many generations without improvement
+    target_fitness: Optional[float] = None  # stop once the best fitness is at or below this
+    time_limit: Optional[float] = None  # seconds for the whole solve
+    progress_interval: float = 0.25  # minimum seconds between progress events of a run
+    # Warm start from previous_assignment
+    warm_start: float = 0.5  # fraction of the initial population seeded from the previous assignment
+    warm_start_perturbation: float = 0.05  # fraction of students swapped in each seeded variant
+    # Constructive seeding: ranking-optimal assignments within group sizes, possible groups and prerequisites
+    seeding: float = 0.0  # fraction of each initial population seeded
+    seeding_noise: float = 0.5  # rank noise of the randomized seed variants
+    crossover: Literal["uniform", "group"] = "uniform"  # group inherits whole groups and keeps sizes
+    repair: bool = False  # restore exact group sizes in every child
+    # Memetic local search on the elite and the final best
+    local_search: Literal["none", "first", "steepest"] = "none"
+    local_search_interval: int = 10  # generations between local-search passes on the elite
+    local_search_elite: int = 1  # fittest individuals improved per pass
+    local_search_time: float = 0.5  # seconds per local-search call
+    profile: bool = False  # report per-phase timings in stats.profile
+    # Checkpoints (need a checkpoint directory: --checkpoint on the CLI and server, or GA_CHECKPOINT_DIR)
+    checkpoint: bool = False  # save each run's population periodically and when it stops
+    checkpoint_interval: int = 10  # generations between checkpoints
+    resume: bool = False  # continue runs from their checkpoints (and keep saving them); generations stays the total budget
+    # Output encoding: "list" of AssignmentResult, "map" of student id -> group id, or parallel "columns"
+    assignment_format: Literal["list", "map", "columns"] = "list"
+
+class AssignmentResult(BaseModel):
+    student_id: int
+    group_id: int
+
 class ProblemInput(BaseModel):
     num_students: int
     num_groups: int
@@ -38,10 +92,57 @@ class ProblemInput(BaseModel):
     students: List[StudentConfig]
     exclude: List[List[int]] = []
     ranking_percentage: float = 50.0
+    # Earlier solution to re-solve from, e.g. the assignments of a previous output
+    previous_assignment: Optional[List[AssignmentResult]] = None
+    change_penalty: float = 0.0  # soft penalty per student moved away from its previous group (scaled like criterion values)
+    solver: SolverConfig = Field(default_factory=SolverConfig)
+    # Students parsed straight into columns by ingest.parse_problem; `students` is built from them on first use
+    _columns: Optional[StudentColumns] = PrivateAttr(default=None)
 
-class AssignmentResult(BaseModel):
-    student_id: int
-    group_id: int
+    @classmethod
+    def from_columns(cls, data: dict, columns: StudentColumns) -> 'ProblemInput':
+        """
+        Validate everything but the students, which are given as already
+        validated columns. The `students` models are only built if read or
+        serialized.
+        """
+        problem = cls.model_validate({**data, "students": []})
+        problem._columns = columns
+        del problem.__dict__["students"]
+        return problem
+
+    def __getattr__(self, name: str):
+        if name == "students" and self._columns is not None:
+            return self._materialize_students()
+        return super().__getattr__(name)
+
+    def _materialize_students(self) -> List[StudentConfig]:
+        students = [
+            StudentConfig.model_construct(id=s_id, possible_groups=possible_groups, values=values, rankings=rankings)
+            for s_id, possible_groups, values, rankings in zip(*self._columns)
+        ]
+        # Keep the field order of a validated model for serialization
+        values = dict(self.__dict__, students=students)
+        self.__dict__.clear()
+        self.__dict__.update({name: values.pop(name) for name in type(self).model_fields if name in values}, **values)
+        return students
+
+    @model_serializer(mode="wrap")
+    def _serialize(self, handler, info: SerializationInfo):
+        excluded = info.exclude is not None and "students" in info.exclude
+        if "students" not in self.__dict__ and not excluded:
+            self._materialize_students()
+        return handler(self)
+
+    def student_columns(self) -> StudentColumns:
+        if self._columns is not None:
+            return self._columns
+        return StudentColumns(
+            ids=[s.id for s in self.students],
+            possible_groups=[s.possible_groups for s in self.students],
+            values=[s.values for s in self.students],
+            rankings=[s.rankings for s in self.students],
+        )
 
 class RankingsStats(BaseModel):
     avg_rank: Optional[float] = None
@@ -51,12 +152,139 @@ class MinimizeCriterionStats(BaseModel):
     max_group_avg_diff: float
     max_group_global_diff: float
 
+class OperatorStats(BaseModel):
+    probability: float  # selection probability at the end of the run
+    uses: int
+    successes: int  # children fitter than both parents
+
+class AdaptiveStats(BaseModel):
+    crossover_rate: float  # probability of any crossover at the end of the run
+    mutation_rate: float  # probability of any mutation at the end of the run
+    crossover: Dict[str, OperatorStats]
+    mutation: Dict[str, OperatorStats]
+
+class RunStats(BaseModel):
+    run: int
+    component: Optional[int] = None  # part of a decomposed problem, largest first
+    seed: int
+    fitness: float
+    initial_fitness: float
+    population_size: int = 0
+    max_generations: int = 0  # generation budget of the run
+    elitism: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    generations: int = 0
+    stop_reason: Optional[str] = None
+    evaluations: int = 0  # individuals scored: initial population, children and immigrants
+    children: int = 0  # children checked for group-size feasibility (repair or group crossover)
+    repaired_children: int = 0
+    infeasible_children: int = 0  # children still violating group sizes
+    local_search_evaluations: int = 0
+    local_search_moves: int = 0
+    local_search_gain: float = 0.0  # fitness reduction from local search
+    local_search_seconds: float = 0.0
+    adaptive: Optional[AdaptiveStats] = None  # operator control, only with solver.adaptive
+    resumed_from: Optional[int] = None  # generation of the checkpoint the run continued from
+
+class PhaseStats(BaseModel):
+    seconds: float
+    calls: int
+
+class ProfileStats(BaseModel):
+    seconds: float  # wall-clock time of the whole solve
+    search_seconds: float  # wall-clock time of the GA runs
+    generations: int  # summed over runs
+    evaluations: int  # summed over runs
+    evaluations_per_second: float  # evaluations per second of search
+    # Cumulative time per phase, summed over runs (and processes, so it can exceed the wall-clock time)
+    phases: Dict[str, PhaseStats]
+
 class ProblemStats(BaseModel):
     rankings: Optional[RankingsStats] = None
     minimize: Optional[Dict[str, MinimizeCriterionStats]] = None
     prerequisites_met: Optional[bool] = None
+    changed_students: Optional[int] = None  # students placed in a different group than in previous_assignment
+    components: Optional[int] = None  # independent parts solved separately
+    runs: Optional[List[RunStats]] = None
+    generations: Optional[int] = None
+    stop_reason: Optional[str] = None
+    profile: Optional[ProfileStats] = None  # only with solver.profile
+
+class CacheInfo(BaseModel):
+    key: str  # content hash of the problem and result-relevant solver settings
+    hit: bool
+    age: Optional[float] = None  # seconds since the cached result was stored
+
+class AssignmentColumns(BaseModel):
+    student_ids: List[int]  # ascending
+    group_ids: List[int]  # group of the student at the same position
 
 class ProblemOutput(BaseModel):
-    assignments: List[AssignmentResult]
+    # Exactly one of these is filled, as chosen by solver.assignment_format
+    assignments: List[AssignmentResult] = []
+    assignment_map: Optional[Dict[int, int]] = None  # student id -> group id
+    assignment_columns: Optional[AssignmentColumns] = None
     status: str
     stats: Optional[ProblemStats] = None
+    cache: Optional[CacheInfo] = None
+
+    def assigned_groups(self) -> Dict[int, int]:
+        """Student id -> group id, whatever the assignment format."""
+        if self.assignment_map is not None:
+            return self.assignment_map
+        if self.assignment_columns is not None:
+            return dict(zip(self.assignment_columns.student_ids, self.assignment_columns.group_ids))
+        return {a.student_id: a.group_id for a in self.assignments}
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class JobProgress(BaseModel):
+    runs_total: int
+    runs_completed: int = 0
+    generation: int = 0  # latest generation reported by any run
+    generations: int = 0
+    best_fitness: Optional[float] = None
+    hard_violations: Optional[int] = None  # of the best solution so far
+    elapsed: float = 0.0
+
+class JobInfo(BaseModel):
+    id: str
+    status: JobStatus
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    progress: Optional[JobProgress] = None
+    result: Optional[ProblemOutput] = None
+    error: Optional[str] = None
+    accepted: bool = False  # stopped early by accepting the best intermediate result
+
+class BatchResult(BaseModel):
+    index: int  # position of the problem in the batch input
+    source: Optional[str] = None  # input file or stdin line (CLI batches)
+    status: JobStatus  # completed or failed
+    result: Optional[ProblemOutput] = None
+    error: Optional[str] = None
+    seconds: float = 0.0  # solve time, 0 for cached results
+
+class RunProgressEvent(BaseModel):
+    run: int
+    generation: int
+    generations: int
+    best_fitness: float
+    mean_fitness: float
+    hard_violations: int
+    elapsed: float
+    finished: bool = False
+
+class BestSolutionEvent(BaseModel):
+    run: int
+    generation: int
+    fitness: float
+    hard_violations: int
+    assignments: List[AssignmentResult]
@@ -1,22 +1,39 @@
-import sys
-from tqdm import tqdm
-from .models import ProblemInput, ProblemOutput, AssignmentResult, CriterionType, ProblemStats, RankingsStats, MinimizeCriterionStats
-from .genetic.population import Population
+import functools
+import multiprocessing
+import os
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from .models import (
+    ProblemInput, ProblemOutput, AssignmentColumns, AssignmentResult, CriterionType, ProblemStats, RankingsStats, MinimizeCriterionStats,
+    PhaseStats, ProfileStats, RunStats, SolverConfig, AdaptiveStats, OperatorStats,
+)
+from .genetic.adaptive import OperatorControl, ProbabilityMatching, adaptive_config
+from .cache import problem_key
+from .genetic.checkpoint import checkpoint_path
+from .genetic.compiled import CompiledProblem, HARD_CONSTRAINT_PENALTY
+from .genetic.decompose import Decomposition, decompose
+from .genetic.fitness import compute_penalties
+from .genetic.islands import run_islands
+from .genetic.local_search import LocalSearchStats
+from .genetic.profiling import PhaseTimes
+from .genetic.runner import GARun, ProgressCallback, RunResult
 
-def _compute_stats(data: ProblemInput, assignments):
-    student_map = {s.id: s for s in data.students}
-    group_students = {g.id: [] for g in data.groups}
-    for assignment in assignments:
-        group_students.setdefault(assignment.group_id, []).append(assignment.student_id)
+def _compute_stats(problem: CompiledProblem, assigned: List[int]):
+    group_students: List[List[int]] = [[] for _ in range(problem.total_groups)]
+    for s, g in enumerate(assigned):
+        group_students[g].append(s)
 
     rankings_stats = None
-    if any(s.rankings for s in data.students):
+    if problem.has_rankings:
         rank_values = []
-        for assignment in assignments:
-            student = student_map.get(assignment.student_id)
-            if not student or not student.rankings:
+        for s, g in enumerate(assigned):
+            rankings = problem.rankings[s]
+            if not rankings:
                 continue
-            rank_values.append(student.rankings.get(assignment.group_id, 0.0))
+            rank_values.append(rankings.get(problem.group_ids[g], 0.0))
         if rank_values:
             rankings_stats = RankingsStats(
                 avg_rank=sum(rank_values) / len(rank_values),
@@ -24,27 +41,25 @@ def _compute_stats(data: ProblemInput, assignments):
             )
 
     minimize_groups = {}
-    for g in data.groups:
-        for c_name, configs in g.criteria.items():
-            if any(c.type == CriterionType.MINIMIZE for c in configs):
-                minimize_groups.setdefault(c_name, []).append(g.id)
+    for g, plans in enumerate(problem.group_plans):
+        for column, configs in plans:
+            if any(c.kind == CriterionType.MINIMIZE for c in configs):
+                minimize_groups.setdefault(column, []).append(g)
 
     minimize_stats = None
     if minimize_groups:
         minimize_stats = {}
-        for c_name, group_ids in minimize_groups.items():
-            if data.students:
-                global_mean = sum(s.values.get(c_name, 0) for s in data.students) / len(data.students)
-            else:
-                global_mean = 0.0
+        for column, groups in minimize_groups.items():
+            values = problem.raw_values[column]
+            global_mean = problem.global_means[column]
 
             group_avgs = []
-            for g_id in group_ids:
-                student_ids = group_students.get(g_id, [])
-                if not student_ids:
+            for g in groups:
+                students = group_students[g]
+                if not students:
                     continue
-                total = sum(student_map[s_id].values.get(c_name, 0) for s_id in student_ids)
-                group_avgs.append(total / len(student_ids))
+                total = sum(values[s] for s in students)
+                group_avgs.append(total / len(students))
 
             if len(group_avgs) >= 2:
                 max_group_avg_diff = max(group_avgs) - min(group_avgs)
@@ -56,25 +71,23 @@ def _compute_stats(data: ProblemInput, assignments):
             else:
                 max_group_global_diff = 0.0
 
-            minimize_stats[c_name] = MinimizeCriterionStats(
+            minimize_stats[problem.criteria[column]] = MinimizeCriterionStats(
                 max_group_avg_diff=max_group_avg_diff,
                 max_group_global_diff=max_group_global_diff,
             )
 
     has_prereq = False
     prerequisites_ok = True
-    for g in data.groups:
-        for c_name, configs in g.criteria.items():
+    for g, group in enumerate(problem.problem.groups):
+        for c_name, configs in group.criteria.items():
+            values = problem.raw_values[problem.criterion_index[c_name]]
             for c_config in configs:
                 if c_config.type != CriterionType.PREREQUISITE or c_config.min_ratio is None:
                     continue
                 has_prereq = True
                 threshold = c_config.min_ratio
-                for s_id in group_students.get(g.id, []):
-                    if student_map[s_id].values.get(c_name, 0) < threshold:
-                        prerequisites_ok = False
-                        break
-                if not prerequisites_ok:
+                if any(values[s] < threshold for s in group_students[g]):
+                    prerequisites_ok = False
                     break
             if not prerequisites_ok:
                 break
@@ -83,80 +96,426 @@ def _compute_stats(data: ProblemInput, assignments):
 
     prerequisites_met = prerequisites_ok if has_prereq else None
 
-    if not rankings_stats and not minimize_stats and prerequisites_met is None:
+    changed_students = None
+    if problem.previous is not None:
+        changed_students = sum(1 for s, g in enumerate(assigned) if problem.previous[s] >= 0 and problem.previous[s] != g)
+
+    if not rankings_stats and not minimize_stats and prerequisites_met is None and changed_students is None:
         return None
 
     return ProblemStats(
         rankings=rankings_stats,
         minimize=minimize_stats,
         prerequisites_met=prerequisites_met,
+        changed_students=changed_students,
     )
 
+def _format_assignments(problem: CompiledProblem, assigned: Sequence[int], assignment_format: str) -> Dict[str, Any]:
+    """ProblemOutput fields holding the assignment in the requested format, ordered by student id."""
+    group_ids = problem.group_ids
+    if assignment_format == "map":
+        return {"assignment_map": {s_id: group_ids[g] for s_id, g in sorted(zip(problem.student_ids, assigned))}}
+    order = sorted(range(problem.num_students), key=problem.student_ids.__getitem__)
+    if assignment_format == "columns":
+        return {"assignment_columns": AssignmentColumns(
+            student_ids=[problem.student_ids[s] for s in order],
+            group_ids=[group_ids[assigned[s]] for s in order],
+        )}
+    return {"assignments": [
+        AssignmentResult(student_id=problem.student_ids[s], group_id=group_ids[assigned[s]]) for s in order
+    ]}
+
 def _run_single_ga(
-    data: ProblemInput,
+    problem: CompiledProblem,
+    config: SolverConfig,
     show_progress: bool,
     run_index: int,
     total_runs: int,
-):
-    # GA parameters
-    POPULATION_SIZE = 120
-    GENERATIONS = 200
-    CROSSOVER_RATE = 1
-    MUTATION_RATE = 0.28
-    ELITISM = 6
-
-    # Initialize population
-    population = Population(data, size=POPULATION_SIZE)
-    
-    # Track initial best fitness
-    initial_best = population.get_best()
-    initial_fitness = initial_best.fitness
-    
-    # Evolution loop
-    run_label = f"GA {run_index + 1}/{total_runs}" if total_runs > 1 else "GA"
-    progress = tqdm(range(GENERATIONS), desc=run_label, unit="gen", disable=not show_progress)
-    for _ in progress:
-        population.evolve(
-            crossover_rate=CROSSOVER_RATE, 
-            mutation_rate=MUTATION_RATE, 
-            elitism=ELITISM
-        )
-        best = population.get_best()
-        progress.set_postfix(best_fitness=f"{best.fitness:.2f}")
-        
-    # Get final best
-    final_best = population.get_best()
-    return final_best, initial_fitness
-
-def solve_assignment(data: ProblemInput, show_progress: bool = False, runs: int = 5) -> ProblemOutput:
-    runs = max(1, runs)
-    best_overall = None
-    best_initial_fitness = None
-    best_run = 1
-
-    for run_index in range(runs):
-        final_best, initial_fitness = _run_single_ga(
-            data=data,
-            show_progress=show_progress,
-            run_index=run_index,
-            total_runs=runs,
-        )
-        if best_overall is None or final_best.fitness < best_overall.fitness:
-            best_overall = final_best
-            best_initial_fitness = initial_fitness
-            best_run = run_index + 1
-    
+    seed: Optional[int] = None,
+    deadline: Optional[float] = None,
+    cancel=None,
+    on_progress: Optional[ProgressCallback] = None,
+    started: Optional[float] = None,
+    checkpoint: Optional[str] = None,
+) -> RunResult:
+    run = GARun(
+        problem, config, run_index, total_runs, seed, show_progress,
+        deadline=deadline, cancel=cancel, on_progress=on_progress, started=started, checkpoint=checkpoint,
+    )
+    run.step()
+    return run.result()
+
+# Problems (the parts of a decomposed problem, or just the whole one), cancel
+# event and progress queue shipped once to each worker process by the pool
+# initializer
+_worker_problems: List[CompiledProblem] = []
+_worker_cancel = None
+_worker_events = None
+
+def _init_worker(problems: List[CompiledProblem], cancel, events):
+    global _worker_problems, _worker_cancel, _worker_events
+    _worker_problems = problems
+    _worker_cancel = cancel
+    _worker_events = events
+
+def _run_in_worker(
+    part: int,
+    config: SolverConfig,
+    show_progress: bool,
+    run_index: int,
+    total_runs: int,
+    seed: int,
+    deadline: Optional[float],
+    started: float,
+    checkpoint: Optional[str],
+    required: bool,
+) -> Optional[RunResult]:
+    """A run in a worker process; None when it is not `required` and its deadline passed before it started."""
+    if not required and deadline is not None and time.monotonic() >= deadline:
+        return None
+    on_progress = _worker_events.put if _worker_events is not None else None
+    return _run_single_ga(
+        _worker_problems[part], config, show_progress, run_index, total_runs, seed, deadline,
+        cancel=_worker_cancel, on_progress=on_progress, started=started, checkpoint=checkpoint,
+    )
+
+def _forward_events(events, on_progress: ProgressCallback):
+    """Relay progress events from worker processes until the None sentinel."""
+    while True:
+        event = events.get()
+        if event is None:
+            return
+        on_progress(event)
+
+def _run_seeds(seed: Optional[int], runs: int) -> List[int]:
+    """Independent per-run seeds, reproducible when a base seed is given."""
+    rng = random.Random(seed)
+    return [rng.getrandbits(63) for _ in range(runs)]
+
+def _run_deadlines(start: float, time_limit: Optional[float], runs: int, workers: int) -> List[Optional[float]]:
+    """
+    Monotonic deadline per run. Runs execute in waves of `workers`; each wave
+    gets an equal share of the time limit, and time left unused by an early
+    stopping wave carries over to the next.
+    """
+    if time_limit is None:
+        return [None] * runs
+    waves = -(-runs // workers)
+    return [start + time_limit * (run_index // workers + 1) / waves for run_index in range(runs)]
+
+def _run_all(
+    problems: List[CompiledProblem],
+    configs: List[SolverConfig],
+    show_progress: bool,
+    cancel=None,
+    on_progress: Optional[ProgressCallback] = None,
+    checkpoint: Optional[Callable[[int], str]] = None,
+    start: Optional[float] = None,
+) -> List[List[RunResult]]:
+    """
+    All runs of every problem, as results[part][run], with configs[part]
+    (they differ only in adaptive sizing). Runs of all parts share the
+    workers as one list of tasks: task t, also its run_index, is run
+    t // parts of part t % parts, so every part gets a run before any gets
+    a second. Islands evolve one part after the other. `checkpoint` maps a
+    task to its checkpoint file.
+
+    The time limit counts from `start` (the start of the solve). Runs after
+    the first of every part are skipped when their deadline has passed
+    before they start, so an exhausted budget returns the best runs so far.
+    """
+    start = start if start is not None else time.monotonic()
+    config = configs[0]
+    parts = len(problems)
+    runs = max(1, config.runs)
+    tasks = runs * parts
+    workers = config.workers if config.workers > 0 else (os.cpu_count() or 1)
+    workers = min(workers, tasks)
+    checkpoints = [checkpoint(t) if checkpoint is not None else None for t in range(max(tasks, config.islands * parts))]
+
+    if config.islands <= 1 and workers <= 1:
+        seeds = _run_seeds(config.seed, tasks)
+        deadlines = _run_deadlines(start, config.time_limit, tasks, workers)
+        results = [
+            _run_single_ga(
+                problems[t % parts], configs[t % parts], show_progress, t, tasks, seeds[t], deadlines[t],
+                cancel=cancel, on_progress=on_progress, started=start, checkpoint=checkpoints[t],
+            )
+            if t < parts or deadlines[t] is None or time.monotonic() < deadlines[t] else None
+            for t in range(tasks)
+        ]
+        return [[r for r in results[part::parts] if r is not None] for part in range(parts)]
+
+    # Worker processes report progress through a queue relayed by a thread
+    events = multiprocessing.Queue() if on_progress is not None else None
+    forwarder = None
+    if events is not None:
+        forwarder = threading.Thread(target=_forward_events, args=(events, on_progress), daemon=True)
+        forwarder.start()
+
+    try:
+        if config.islands > 1:
+            seeds = _run_seeds(config.seed, config.islands * parts)
+            results = []
+            for part in range(parts):
+                # Parts run one after the other, each with its share of the time limit
+                deadline = start + config.time_limit * (part + 1) / parts if config.time_limit is not None else None
+                run_indices = list(range(part, config.islands * parts, parts))
+                results.append(run_islands(
+                    problems[part], configs[part], [seeds[t] for t in run_indices], show_progress, deadline,
+                    cancel, events, start, run_indices=run_indices, checkpoints=[checkpoints[t] for t in run_indices],
+                ))
+            return results
+
+        seeds = _run_seeds(config.seed, tasks)
+        deadlines = _run_deadlines(start, config.time_limit, tasks, workers)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(problems, cancel, events)) as executor:
+            futures = [
+                executor.submit(
+                    _run_in_worker, t % parts, configs[t % parts], show_progress, t, tasks, seeds[t], deadlines[t], start,
+                    checkpoints[t], t < parts,
+                )
+                for t in range(tasks)
+            ]
+            results = [future.result() for future in futures]
+            return [[r for r in results[part::parts] if r is not None] for part in range(parts)]
+    finally:
+        if events is not None:
+            events.put(None)
+            forwarder.join()
+
+class _PartsProgress:
+    """
+    Progress of a decomposed solve: combines the events of every part's runs
+    into events for the whole problem. Event run r stands for run r of every
+    part and reports the summed best fitness of the parts (and their merged
+    best assignment when one improved). Nothing is reported until every part
+    has a best solution; run r finishes with the last part's run r.
+    """
+
+    def __init__(self, problem: CompiledProblem, decomposition: Decomposition, callback: ProgressCallback):
+        self.problem = problem
+        self.decomposition = decomposition
+        self.callback = callback
+        parts = len(decomposition.parts)
+        self.best_fitness = [float('inf')] * parts
+        self.best_hard = [0] * parts
+        # Configured groups no student can join violate their sizes in every assignment
+        self.idle_hard = sum(problem.group_sizes[g] for g in decomposition.idle_groups)
+        self.best_assigned: List[Optional[List[int]]] = [None] * parts
+        self.mean_fitness = [0.0] * parts
+        self.finished: Dict[int, int] = {}
+        self.improved = False
+
+    def __call__(self, event):
+        parts = len(self.decomposition.parts)
+        run, part = divmod(event.run_index, parts)
+        if event.assigned is not None and event.best_fitness < self.best_fitness[part]:
+            self.best_fitness[part] = event.best_fitness
+            self.best_hard[part] = event.hard_violations
+            self.best_assigned[part] = event.assigned
+            self.improved = True
+        self.mean_fitness[part] = event.mean_fitness
+        finished = False
+        if event.finished:
+            self.finished[run] = self.finished.get(run, 0) + 1
+            finished = self.finished[run] == parts
+        if any(assigned is None for assigned in self.best_assigned):
+            return
+
+        idle = self.decomposition.idle_penalty
+        best_fitness = sum(self.best_fitness) + idle
+        assigned = None
+        if self.improved:
+            assigned = self.decomposition.merge(self.problem, self.best_assigned)
+            self.improved = False
+        self.callback(event._replace(
+            run_index=run,
+            best_fitness=best_fitness,
+            mean_fitness=sum(self.mean_fitness) + idle,
+            hard_violations=sum(self.best_hard) + self.idle_hard,
+            assigned=assigned,
+            finished=finished,
+        ))
+
+def _merge_parts(problem: CompiledProblem, decomposition: Decomposition, results: List[List[RunResult]]) -> RunResult:
+    """
+    The best run of every part combined into one result for the whole
+    problem, rescored as a whole. Generations are those of the longest
+    part; seed and stop reason those of the largest.
+    """
+    bests = [min(runs, key=lambda r: r.fitness) for runs in results]
+    assigned = decomposition.merge(problem, [best.assigned for best in bests])
+    hard, soft = compute_penalties(assigned, problem)
+    largest = bests[0]
+    return RunResult(
+        largest.run_index,
+        largest.seed,
+        assigned,
+        hard * HARD_CONSTRAINT_PENALTY + soft,
+        sum(best.initial_fitness for best in bests) + decomposition.idle_penalty,
+        generations=max(best.generations for best in bests),
+        stop_reason=largest.stop_reason,
+        local_search=LocalSearchStats(),
+        phases=PhaseTimes(),
+    )
+
+def _operator_stats(arms: ProbabilityMatching) -> Dict[str, OperatorStats]:
+    return {
+        arm: OperatorStats(probability=probability, uses=arms.uses[arm], successes=arms.successes[arm])
+        for arm, probability in arms.probabilities().items()
+    }
+
+def _adaptive_stats(control: OperatorControl) -> AdaptiveStats:
+    return AdaptiveStats(
+        crossover_rate=control.crossover_rate,
+        mutation_rate=control.mutation_rate,
+        crossover=_operator_stats(control.crossover),
+        mutation=_operator_stats(control.mutation),
+    )
+
+def _profile(times: PhaseTimes, results: List[RunResult], seconds: float, search_seconds: float) -> ProfileStats:
+    evaluations = sum(r.evaluations for r in results)
+    return ProfileStats(
+        seconds=seconds,
+        search_seconds=search_seconds,
+        generations=sum(r.generations for r in results),
+        evaluations=evaluations,
+        evaluations_per_second=evaluations / search_seconds if search_seconds > 0 else 0.0,
+        phases={
+            phase: PhaseStats(seconds=times.seconds[phase], calls=times.calls[phase])
+            for phase in times.seconds
+        },
+    )
+
+def solve_assignment(
+    data: ProblemInput,
+    show_progress: bool = False,
+    config: Optional[SolverConfig] = None,
+    cancel=None,
+    on_progress: Optional[ProgressCallback] = None,
+    on_profile: Optional[Callable[[ProfileStats], None]] = None,
+    checkpoint_dir: Optional[str] = None,
+) -> ProblemOutput:
+    """
+    Solve an assignment problem with the GA.
+
+    `cancel` is an Event checked between generations; runs stop early and the
+    best solution found so far is returned. Use a multiprocessing.Event when
+    runs execute in worker processes (workers > 1 or islands).
+    `on_progress` receives throttled ProgressEvents from every run, in this
+    process; their `assigned` lists hold group ids in input student order.
+    With solver.decompose, independent parts of the problem (connected
+    components of students, their possible groups and exclusions) are
+    solved separately and merged; progress events then describe the whole
+    problem (see _PartsProgress) and stats.runs lists every part's runs.
+    `on_profile` receives the solve's ProfileStats, which are also returned in
+    stats.profile when solver.profile is set.
+    With solver.checkpoint or solver.resume, every run keeps a checkpoint
+    file in `checkpoint_dir`, named by the problem's content hash (without
+    solver settings) and the run, so a resubmitted problem finds them.
+    """
+    config = config or data.solver
+    # The time limit covers compilation and population initialization too
+    start = time.monotonic()
+    solve_start = time.perf_counter()
+    times = PhaseTimes()
+    with times.timed("compile"):
+        problem = CompiledProblem(data)
+    decomposition = None
+    if config.decompose:
+        with times.timed("decompose"):
+            decomposition = decompose(problem)
+    problems = [part.problem for part in decomposition.parts] if decomposition is not None else [problem]
+    configs = [
+        adaptive_config(config, part.num_students, part.num_groups) if config.adaptive else config
+        for part in problems
+    ]
+    if config.adaptive:
+        config = adaptive_config(config, problem.num_students, problem.num_groups)
+
+    if on_progress is not None:
+        callback = on_progress
+
+        def on_progress(event):
+            if event.assigned is not None:
+                event = event._replace(assigned=[problem.group_ids[g] for g in event.assigned])
+            callback(event)
+
+        if decomposition is not None:
+            on_progress = _PartsProgress(problem, decomposition, on_progress)
+
+    checkpoint = None
+    if config.checkpoint or config.resume:
+        if checkpoint_dir is None:
+            raise ValueError("Checkpoints need a checkpoint directory")
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        checkpoint = functools.partial(checkpoint_path, checkpoint_dir, problem_key(data, SolverConfig()), len(problems))
+
+    search_start = time.perf_counter()
+    part_results = _run_all(problems, configs, show_progress, cancel, on_progress, checkpoint, start)
+    search_seconds = time.perf_counter() - search_start
+    results = sorted((r for runs in part_results for r in runs), key=lambda r: r.run_index)
+    for r in results:
+        times.merge(r.phases)
+    if decomposition is not None:
+        best = _merge_parts(problem, decomposition, part_results)
+    else:
+        best = min(results, key=lambda r: r.fitness)
+
     # Format results
-    assignments = [
-        AssignmentResult(student_id=s_id, group_id=g_id)
-        for s_id, g_id in best_overall.genes.items()
+    with times.timed("formatting"):
+        assignments = _format_assignments(problem, best.assigned, config.assignment_format)
+
+    status = (
+        f"FITNESS: {best.fitness}; INITIAL FITNESS: {best.initial_fitness}; "
+        f"GENERATIONS: {best.generations}; STOP: {best.stop_reason}; "
+    )
+
+    with times.timed("stats"):
+        stats = _compute_stats(problem, best.assigned) or ProblemStats()
+    stats.generations = best.generations
+    stats.stop_reason = best.stop_reason
+    parts = len(problems)
+    if decomposition is not None:
+        stats.components = parts
+    stats.runs = [
+        RunStats(
+            run=r.run_index // parts + 1,
+            component=r.run_index % parts if decomposition is not None else None,
+            seed=r.seed,
+            fitness=r.fitness,
+            initial_fitness=r.initial_fitness,
+            population_size=r.population_size,
+            max_generations=r.max_generations,
+            elitism=r.elitism,
+            cache_hits=r.cache_hits,
+            cache_misses=r.cache_misses,
+            generations=r.generations,
+            stop_reason=r.stop_reason,
+            evaluations=r.evaluations,
+            children=r.children,
+            repaired_children=r.repaired_children,
+            infeasible_children=r.infeasible_children,
+            local_search_evaluations=r.local_search.evaluations,
+            local_search_moves=r.local_search.moves,
+            local_search_gain=r.local_search.gain,
+            local_search_seconds=r.local_search.seconds,
+            adaptive=_adaptive_stats(r.operators) if r.operators is not None else None,
+            resumed_from=r.resumed_from,
+        )
+        for r in results
     ]
-    assignments.sort(key=lambda a: a.student_id)
-    
-    status = f"FITNESS: {best_overall.fitness}; INITIAL FITNESS: {best_initial_fitness}; "
+
+    if config.profile or on_profile is not None:
+        profile = _profile(times, results, time.perf_counter() - solve_start, search_seconds)
+        if config.profile:
+            stats.profile = profile
+        if on_profile is not None:
+            on_profile(profile)
 
     return ProblemOutput(
-        assignments=assignments,
+        **assignments,
         status=status,
-        stats=_compute_stats(data, assignments),
+        stats=stats,
     )
@@ -0,0 +1,85 @@
+import random
+from typing import Optional, Sequence
+from .models import CriterionType, ProblemInput
+
+CRITERION_KINDS = tuple(kind.value for kind in CriterionType)
+
+def generate_problem(
+    num_students: int,
+    num_groups: Optional[int] = None,
+    criteria: Sequence[str] = CRITERION_KINDS,
+    exclusion_density: float = 0.05,
+    ranking_density: float = 0.5,
+    possible_ratio: float = 0.5,
+    prerequisite_ratio: float = 0.2,
+    prerequisite_share: float = 0.25,
+    seed: int = 0,
+) -> ProblemInput:
+    """
+    Seeded random problem for benchmarks.
+
+    - num_groups defaults to one group per 25 students; group sizes add up to
+      num_students.
+    - criteria lists one criterion type per value column (minimize, pull,
+      prerequisite). Minimize and pull criteria apply to every group,
+      prerequisite criteria to a prerequisite_share of the groups with
+      prerequisite_ratio as min_ratio.
+    - exclusion_density is the number of exclusion pairs per student.
+    - ranking_density is the share of students ranking up to three of their
+      possible groups.
+    - possible_ratio is the share of groups each student may join (at least one).
+
+    A hidden assignment satisfies every hard constraint, so the problem is
+    always feasible. The same arguments always produce the same problem.
+    """
+    rng = random.Random(seed)
+    num_groups = num_groups or max(2, num_students // 25)
+    group_ids = list(range(1, num_groups + 1))
+    base, extra = divmod(num_students, num_groups)
+    sizes = [base + (i < extra) for i in range(num_groups)]
+
+    # Hidden feasible assignment: group index per student
+    planted = [g for g, size in enumerate(sizes) for _ in range(size)]
+    rng.shuffle(planted)
+
+    columns = [(f"c{i}", CriterionType(kind)) for i, kind in enumerate(criteria)]
+    gated = set(rng.sample(range(num_groups), round(prerequisite_share * num_groups)))
+    groups = []
+    for g, g_id in enumerate(group_ids):
+        group_criteria = {}
+        for name, kind in columns:
+            if kind != CriterionType.PREREQUISITE:
+                group_criteria[name] = {"type": kind.value}
+            elif g in gated:
+                group_criteria[name] = {"type": kind.value, "min_ratio": prerequisite_ratio}
+        groups.append({"id": g_id, "size": sizes[g], "criteria": group_criteria})
+
+    per_student = max(1, min(num_groups, round(possible_ratio * num_groups)))
+    students = []
+    for s_id, g in enumerate(planted):
+        others = rng.sample(group_ids[:g] + group_ids[g + 1:], per_student - 1)
+        possible = [group_ids[g]] + others
+        values = {}
+        for name, kind in columns:
+            low = prerequisite_ratio if kind == CriterionType.PREREQUISITE and g in gated else 0.0
+            values[name] = round(rng.uniform(low, 1.0), 3)
+        student = {"id": s_id, "possible_groups": possible, "values": values}
+        if rng.random() < ranking_density:
+            ranked = rng.sample(possible, min(3, len(possible)))
+            student["rankings"] = {g_id: float(rng.randint(1, 5)) for g_id in ranked}
+        students.append(student)
+
+    exclude = []
+    if num_groups >= 2 and num_students >= 2:
+        while len(exclude) < round(exclusion_density * num_students):
+            a, b = rng.sample(range(num_students), 2)
+            if planted[a] != planted[b]:
+                exclude.append([a, b])
+
+    return ProblemInput(
+        num_students=num_students,
+        num_groups=num_groups,
+        groups=groups,
+        students=students,
+        exclude=exclude,
+    )
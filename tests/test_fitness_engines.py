@@ -0,0 +1,164 @@
+"""The fitness engines must agree with compute_penalties on every assignment."""
+import random
+from array import array
+
+import pytest
+
+from src.assignment.models import AssignmentResult, ProblemInput
+from src.assignment.solver import _merge_parts
+from src.assignment.synthetic import generate_problem
+from src.assignment.genetic.chromosome import Chromosome
+from src.assignment.genetic.compiled import CompiledProblem, HARD_CONSTRAINT_PENALTY
+from src.assignment.genetic.decompose import decompose
+from src.assignment.genetic.fitness import compute_penalties, evaluate_fitness
+from src.assignment.genetic.incremental import FitnessState
+from src.assignment.genetic.population import Population
+from src.assignment.genetic.runner import RunResult
+from src.assignment.genetic.vectorized import VectorizedEvaluator, numpy_available
+
+SEEDS = range(4)
+
+def _fitness(assigned, problem: CompiledProblem) -> float:
+    hard, soft = compute_penalties(assigned, problem)
+    return hard * HARD_CONSTRAINT_PENALTY + soft
+
+def _problem(seed: int) -> CompiledProblem:
+    data = generate_problem(60 + 20 * seed, seed=seed, ranking_density=0.7, exclusion_density=0.2)
+    if seed % 2:
+        # Re-solve from a previous assignment with a change penalty
+        rng = random.Random(seed)
+        previous = [
+            AssignmentResult(student_id=s.id, group_id=rng.choice(s.possible_groups))
+            for s in data.students if rng.random() < 0.8
+        ]
+        data = data.model_copy(update={"previous_assignment": previous, "change_penalty": 3.0})
+    return CompiledProblem(data)
+
+def _random_assignment(problem: CompiledProblem, rng: random.Random) -> array:
+    # Any group, not just possible ones, so every penalty term is exercised
+    return array('i', (rng.randrange(problem.total_groups) for _ in range(problem.num_students)))
+
+def _combined(*problems: ProblemInput) -> ProblemInput:
+    """Independent problems merged into one, with ids offset so nothing connects them."""
+    data = {"num_students": 0, "num_groups": 0, "groups": [], "students": [], "exclude": []}
+    for i, problem in enumerate(problems):
+        offset = 10000 * i
+        part = problem.model_dump()
+        data["num_students"] += part["num_students"]
+        data["num_groups"] += part["num_groups"]
+        data["groups"] += [{**group, "id": group["id"] + offset} for group in part["groups"]]
+        data["students"] += [
+            {
+                **student,
+                "id": student["id"] + offset,
+                "possible_groups": [g + offset for g in student["possible_groups"]],
+                "rankings": {g + offset: rank for g, rank in (student["rankings"] or {}).items()},
+            }
+            for student in part["students"]
+        ]
+        data["exclude"] += [[a + offset, b + offset] for a, b in part["exclude"]]
+    return ProblemInput.model_validate(data)
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_evaluate_fitness_and_state_match_compute_penalties(seed):
+    problem = _problem(seed)
+    rng = random.Random(seed)
+    for _ in range(20):
+        genes = _random_assignment(problem, rng)
+        hard, _ = compute_penalties(genes, problem)
+        chromosome = Chromosome(genes)
+        assert evaluate_fitness(chromosome, problem) == _fitness(genes, problem)
+        assert chromosome.hard == hard
+        state = FitnessState(problem, genes[:])
+        assert state.fitness == _fitness(genes, problem)
+        assert state.hard == hard
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_move_and_swap_deltas_match_rescoring(seed):
+    problem = _problem(seed)
+    rng = random.Random(seed)
+    state = FitnessState(problem, _random_assignment(problem, rng))
+    for _ in range(300):
+        before = _fitness(state.assigned, problem)
+        if rng.random() < 0.5:
+            s, g = rng.randrange(problem.num_students), rng.randrange(problem.total_groups)
+            delta = state.move_delta(s, g)
+            state.move(s, g)
+        else:
+            s1, s2 = rng.sample(range(problem.num_students), 2)
+            delta = state.swap_delta(s1, s2)
+            state.swap(s1, s2)
+        after = _fitness(state.assigned, problem)
+        assert delta == pytest.approx(after - before, abs=1e-6)
+        assert state.fitness == after
+        assert state.hard == compute_penalties(state.assigned, problem)[0]
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_chromosome_moves_keep_state_fitness(seed):
+    problem = _problem(seed)
+    rng = random.Random(seed)
+    genes = _random_assignment(problem, rng)
+    chromosome = Chromosome(genes, FitnessState(problem, genes))
+    for _ in range(100):
+        copy = chromosome.copy()
+        if rng.random() < 0.5:
+            copy.move(rng.randrange(problem.num_students), rng.randrange(problem.total_groups))
+        else:
+            copy.swap(*rng.sample(range(problem.num_students), 2))
+        assert copy.fitness == _fitness(copy.genes, problem)
+        assert copy.hard == compute_penalties(copy.genes, problem)[0]
+        # The original is untouched by its copy's moves
+        assert chromosome.fitness == _fitness(chromosome.genes, problem)
+        chromosome = copy
+
+@pytest.mark.skipif(not numpy_available(), reason="NumPy is not installed")
+@pytest.mark.parametrize("seed", SEEDS)
+def test_vectorized_evaluator_matches_compute_penalties(seed):
+    problem = _problem(seed)
+    rng = random.Random(seed)
+    rows = [_random_assignment(problem, rng) for _ in range(30)]
+    evaluator = VectorizedEvaluator(problem)
+    assert evaluator.score(rows) == [_fitness(row, problem) for row in rows]
+    assert evaluator.score_with_hard(rows) == [
+        (_fitness(row, problem), compute_penalties(row, problem)[0]) for row in rows
+    ]
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_fitness_cache_returns_scored_fitness(engine):
+    if engine == "numpy" and not numpy_available():
+        pytest.skip("NumPy is not installed")
+    problem = _problem(1)
+    rng = random.Random(1)
+    population = Population(problem, size=10, engine=engine, seed=1, cache_size=64)
+    genes = [_random_assignment(problem, rng) for _ in range(5)]
+    # Every assignment twice: the second copy is answered from the cache
+    population.individuals = [Chromosome(row[:]) for row in genes + genes]
+    population.evaluate()
+    population.individuals = [Chromosome(row[:]) for row in genes]
+    population.evaluate()
+    assert population.cache.hits >= len(genes)
+    for individual in population.individuals:
+        assert individual.fitness == _fitness(individual.genes, problem)
+        assert individual.hard == compute_penalties(individual.genes, problem)[0]
+
+def test_merged_parts_fitness_equals_full_rescore():
+    data = _combined(*(generate_problem(40 + 10 * seed, seed=seed, ranking_density=0.7) for seed in range(3)))
+    problem = CompiledProblem(data)
+    decomposition = decompose(problem)
+    assert decomposition is not None and len(decomposition.parts) == 3
+
+    rng = random.Random(0)
+    results = []
+    for index, part in enumerate(decomposition.parts):
+        runs = []
+        for run in range(2):
+            assigned = [rng.choice(part.problem.possible[s]) for s in range(part.problem.num_students)]
+            fitness = _fitness(assigned, part.problem)
+            runs.append(RunResult(index + run * len(decomposition.parts), 0, assigned, fitness, fitness))
+        results.append(runs)
+
+    merged = _merge_parts(problem, decomposition, results)
+    assert merged.fitness == _fitness(merged.assigned, problem)
+    # Parts are scored additively: their best fitnesses sum to the whole
+    best = sum(min(run.fitness for run in runs) for runs in results) + decomposition.idle_penalty
+    assert merged.fitness == pytest.approx(best, rel=1e-12)